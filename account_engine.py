@@ -0,0 +1,620 @@
+#!/usr/bin/env python3
+"""
+账号处理引擎 - 在后台事件循环中用Playwright异步API同时处理多个账号
+"""
+
+import asyncio
+import functools
+import threading
+import time
+import traceback
+
+from page_helper import (DEFAULT_WAIT_TIMEOUTS, DEFAULT_SESSION_COOKIES, DEFAULT_COOKIE_ALLOWLIST,
+                         LOGIN_SELECTORS, CookieCapture, filter_cookies, cookie_header,
+                         wait_for_cookies, wait_for_cookies_settled)
+
+
+class OwnerInfoUnavailable(Exception):
+    """info接口请求失败（网络错误、超时或熔断），无法判断Cookie是否有效"""
+
+
+class EventLoopThread:
+    """
+    在后台线程中运行的asyncio事件循环
+
+    其他线程通过submit提交协程，得到concurrent.futures.Future，可以阻塞等待结果，
+    也可以在界面线程中通过回调获取结果。
+    """
+
+    def __init__(self, name="AccountEngine"):
+        self.name = name
+        self.loop = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self.loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """在事件循环中运行协程，返回concurrent.futures.Future"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self, timeout=5):
+        """停止事件循环"""
+        if self._thread is None:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self.loop.close()
+        self._thread = None
+
+
+class AccountEngine:
+    """
+    账号处理引擎
+
+    在EventLoopThread的事件循环中运行，max_workers个处理任务共用一个浏览器池，
+    每个账号使用独立的浏览器上下文。app为界面对象，需要提供log、update_status、
+    account_event、open_dialog、show_code_dialog、show_account_dialog、
+    send_account_info和mark_processed。API请求通过AsyncCurlHelper发送，并发数受
+    max_in_flight限制；文件写入等其他阻塞操作在线程池中执行，不阻塞事件循环。
+    """
+
+    def __init__(self, browser_config, app, get_api_client, stop_event):
+        self.browser_config = browser_config
+        self.app = app
+        self.log = app.log
+        self.get_api_client = get_api_client
+        self.stop_event = stop_event
+
+        # 各步骤的等待上限
+        self.wait_timeouts = dict(DEFAULT_WAIT_TIMEOUTS)
+        self.wait_timeouts.update(browser_config.get("wait_timeouts", {}))
+        self.session_cookie_names = browser_config.get("session_cookies", DEFAULT_SESSION_COOKIES)
+
+        # Cookie获取方式：network为监听user/info响应，poll为轮询context.cookies()
+        self.cookie_capture = browser_config.get("cookie_capture", "network") == "network"
+        self.cookie_allowlist = dict(DEFAULT_COOKIE_ALLOWLIST)
+        self.cookie_allowlist.update(browser_config.get("cookie_allowlist", {}))
+        # 多选账户时同时打开的账户页数
+        self.max_account_pages = max(1, int(browser_config.get("max_account_pages", 4)))
+        self.max_workers = max(1, int(browser_config.get("max_workers", 1)))
+        self.prewarm = browser_config.get("prewarm_next", True)
+
+        # 保存的登录会话，有效时跳过验证码登录
+        self.session_store = None
+        if browser_config.get("reuse_sessions", True):
+            from session_store import SessionStore
+            self.session_store = SessionStore(
+                browser_config.get("session_dir", "sessions"),
+                max_age=browser_config.get("session_max_age", 7 * 24 * 3600)
+            )
+
+        self.browser_pool = None
+        self.api = None
+        self._dialog_lock = None
+
+    def create_browser_pool(self):
+        """按浏览器配置创建浏览器池"""
+        from browser_pool import BrowserPool, ResourceFilter
+
+        return BrowserPool(
+            executable_path=self.browser_config.get("chrome_path"),
+            headless=self.browser_config.get("headless", False),
+            recycle_after=self.browser_config.get("browser_recycle_after", 20),
+            resource_filter=ResourceFilter.from_config(self.browser_config),
+            log=self.log
+        )
+
+    def create_api_client(self):
+        """与界面共用CurlHelper的连接池和缓存，并发请求数受max_in_flight限制"""
+        from async_curl_helper import AsyncCurlHelper
+
+        return AsyncCurlHelper(client=self.get_api_client(), verbose=False)
+
+    async def _blocking(self, func, *args, **kwargs):
+        """在线程池中执行阻塞操作"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    async def run(self, accounts):
+        """
+        处理账号列表
+
+        accounts为 (手机号, 备注) 列表，返回 {"started", "finished", "succeeded"}。
+        """
+        total_accounts = len(accounts)
+        worker_count = min(self.max_workers, max(1, total_accounts))
+        self.log(f"开始处理 {total_accounts} 个账号，并发数: {worker_count}")
+        if self.browser_config.get("headless"):
+            self.log("使用无头模式运行浏览器")
+        if self.browser_config.get("block_resources") or self.browser_config.get("block_analytics"):
+            self.log(f"屏蔽资源类型: {self.browser_config.get('block_resources', [])}，"
+                     f"屏蔽统计请求: {bool(self.browser_config.get('block_analytics'))}")
+        self.app.update_status(f"处理中... (0/{total_accounts})")
+
+        pending = asyncio.Queue()
+        for index, (username, _) in enumerate(accounts):
+            pending.put_nowait((index, username))
+        progress = {"started": 0, "finished": 0, "succeeded": 0, "total": total_accounts}
+
+        self._dialog_lock = asyncio.Lock()
+        self.api = self.create_api_client()
+        self.browser_pool = self.create_browser_pool()
+        try:
+            await asyncio.gather(*(self._worker(pending, progress) for _ in range(worker_count)))
+        finally:
+            await self.browser_pool.close()
+            self.browser_pool = None
+            await self.api.close()
+            self.api = None
+        return progress
+
+    def _report_progress(self, progress):
+        in_flight = progress["started"] - progress["finished"]
+        self.app.update_status(f"处理中... ({progress['finished']}/{progress['total']}，进行中 {in_flight})")
+
+    async def _worker(self, pending, progress):
+        """处理任务，依次从队列取出账号处理"""
+        # 等待验证码期间提前准备的下一个账号 (序号, 手机号, 准备任务)
+        prepared_next = None
+
+        def prepare_next():
+            """从队列取出下一个账号，在后台提前打开登录表单并填好手机号"""
+            nonlocal prepared_next
+            if prepared_next is not None or self.stop_event.is_set():
+                return
+            try:
+                next_index, next_username = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            self.log(f"预热下一个账号的登录页: {next_username}")
+            task = asyncio.ensure_future(self.prepare_account(next_username, open_form=True))
+            prepared_next = (next_index, next_username, task)
+
+        try:
+            while not self.stop_event.is_set():
+                if prepared_next is not None:
+                    index, username, task = prepared_next
+                    prepared_next = None
+                    try:
+                        prepared = await task
+                    except Exception as e:
+                        # 预热失败时该账号仍按正常流程处理
+                        self.log(f"预热账号 {username} 的登录页失败: {e}")
+                        prepared = None
+                else:
+                    try:
+                        index, username = pending.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                    prepared = None
+
+                progress["started"] += 1
+                self._report_progress(progress)
+                # started事件会清除账号库中的上传失败状态，在线程池中执行
+                await self._blocking(self.app.account_event, username, "started")
+                self.log(f"正在处理账号 ({index + 1}/{progress['total']}): {username}")
+
+                result = False
+                try:
+                    result = await self.process_account(username, prepared, prepare_next if self.prewarm else None)
+
+                    if result:
+                        await self._blocking(self.app.mark_processed, username)
+                        self.log(f"账号 {username} 处理成功")
+                    else:
+                        self.log(f"账号 {username} 处理失败")
+
+                except Exception as e:
+                    self.log(f"处理账号 {username} 时出错: {e}")
+                    traceback.print_exc()
+                finally:
+                    progress["finished"] += 1
+                    if result:
+                        progress["succeeded"] += 1
+                    self._report_progress(progress)
+                    self.app.account_event(username, "finished")
+        finally:
+            # 停止处理时释放已预热但未处理的账号
+            if prepared_next is not None:
+                try:
+                    prepared = await prepared_next[2]
+                except Exception:
+                    prepared = None
+                if prepared is not None:
+                    await self.release_prepared(prepared)
+
+    async def process_account(self, username, prepared=None, while_waiting=None):
+        """
+        严格按照指定流程处理单个账号，有可用的已保存会话时跳过验证码登录
+
+        prepared为prepare_account提前准备好的登录页；while_waiting在验证码对话框
+        显示后调用，用于预热下一个账号。
+        """
+        try:
+            if prepared is None:
+                prepared = await self.prepare_account(username)
+            context, page = prepared["context"], prepared["page"]
+            result = False
+            try:
+                restored = prepared["restored"]
+                if restored:
+                    _, cookie_string, resp_json = restored
+                else:
+                    cookie_string = await self.login_with_code(username, context, page, prepared["form_ready"],
+                                                               while_waiting)
+                    if not cookie_string:
+                        return False
+                    # 登录成功后立即保存会话，后续查询或上传失败时下次仍可跳过验证码登录
+                    await self.save_session(username, context)
+                    try:
+                        resp_json = await self.query_owner_info(username, cookie_string)
+                    except OwnerInfoUnavailable:
+                        self.log(f"info接口暂不可用，账号 {username} 本次未上传")
+                        return False
+                    if resp_json is None:
+                        return False
+
+                account_id = await self.upload_account(username, context, page, cookie_string, resp_json)
+                result = account_id is not False
+                if result:
+                    await self.save_session(username, context, account_id)
+            finally:
+                await self.release_prepared(prepared)
+            return result
+        except Exception as e:
+            self.log(f"处理过程出错: {e}")
+            traceback.print_exc()
+            return False
+
+    async def save_session(self, username, context, account_id=None):
+        """保存浏览器上下文的登录会话，失败只记录日志"""
+        if self.session_store is None:
+            return
+        try:
+            state = await context.storage_state()
+            await self._blocking(self.session_store.save, username, state, account_id)
+            self.log(f"已保存账号 {username} 的登录会话")
+        except Exception as e:
+            self.log(f"保存登录会话失败: {e}")
+
+    async def prepare_account(self, username, open_form=False):
+        """
+        为账号打开浏览器上下文和页面
+
+        有可用的已保存会话时直接使用；open_form为True时提前打开登录表单并填好手机号，
+        但不发送验证码。返回的记录交给process_account继续处理。
+        """
+        restored = await self.restore_session(username)
+        context_options = {"storage_state": restored[0]} if restored else {}
+        context = await self.browser_pool.acquire_context(**context_options)
+        try:
+            page = await context.new_page()
+        except Exception:
+            await self.browser_pool.release_context(context)
+            raise
+        prepared = {"context": context, "page": page, "restored": restored, "form_ready": False}
+        if open_form and not restored:
+            try:
+                prepared["form_ready"] = await self.open_login_form(username, page)
+            except Exception as e:
+                self.log(f"预热账号 {username} 的登录页失败: {e}")
+        return prepared
+
+    async def release_prepared(self, prepared):
+        """关闭页面和浏览器上下文"""
+        try:
+            await prepared["page"].close()
+            self.log("页面已关闭")
+        except Exception as e:
+            self.log(f"关闭页面时出错: {e}")
+        await self.browser_pool.release_context(prepared["context"])
+
+    async def restore_session(self, username):
+        """
+        读取已保存的会话并通过info接口校验
+
+        会话有效时返回 (storage_state, Cookie字符串, info响应)，否则删除会话并返回None。
+        """
+        if self.session_store is None:
+            return None
+        record = await self._blocking(self.session_store.load, username)
+        if record is None:
+            return None
+        state = record["state"]
+        cookie_string = self.build_cookie_string(self.session_store.live_cookies(state))
+        if not cookie_string:
+            await self._blocking(self.session_store.delete, username)
+            return None
+
+        self.log(f"找到账号 {username} 保存于 {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record['saved_at']))} 的会话，校验中...")
+        # 校验会话时不使用缓存，避免把已失效的Cookie当成有效
+        try:
+            resp_json = await self.query_owner_info(username, cookie_string, use_cache=False)
+        except OwnerInfoUnavailable:
+            # 接口暂不可用时无法判断会话是否失效，保留会话文件，下次处理时再校验
+            self.log("info接口暂不可用，保留已保存的会话，本次使用验证码登录")
+            return None
+        if resp_json is None:
+            self.log("已保存的会话已失效，使用验证码登录")
+            await self._blocking(self.session_store.delete, username)
+            return None
+        self.log("已保存的会话有效，跳过验证码登录")
+        return state, cookie_string, resp_json
+
+    async def open_login_form(self, username, page):
+        """打开登录页，切换到验证码登录并填好手机号，失败返回False"""
+        wait_timeouts = self.wait_timeouts
+
+        # 1. 打开快手牛平台
+        await page.goto("https://niu.e.kuaishou.com/welcome")
+        self.log("已打开快手牛平台")
+        await page.wait_for_load_state("networkidle")
+
+        # 2. 检测并点击"立即登录"按钮，同时检测按钮的几种渲染结构
+        self.log("检测是否存在'立即登录'按钮...")
+        selector_timeout = wait_timeouts["selector"]
+        login_button = await LOGIN_SELECTORS["login_button"].find(page, timeout=selector_timeout)
+        if not login_button:
+            self.log("未找到'立即登录'按钮")
+            return False
+        self.log("找到'立即登录'按钮，点击中...")
+        await login_button.click()
+        self.log("已点击'立即登录'按钮")
+
+        # 3. 切换到验证码登录，等待登录表单中的选项卡出现
+        self.log("查找'验证码登录'选项卡...")
+        code_login_tab = await LOGIN_SELECTORS["code_login_tab"].find(page, timeout=wait_timeouts["login_form"])
+        if not code_login_tab:
+            self.log("未找到'验证码登录'选项卡")
+            return False
+        self.log("找到'验证码登录'选项卡，点击中...")
+        await code_login_tab.click()
+        self.log("已切换到验证码登录模式")
+
+        # 4. 输入手机号
+        self.log(f"正在输入手机号: {username}")
+        phone_input = await LOGIN_SELECTORS["phone_input"].require(page, timeout=selector_timeout)
+        await phone_input.fill(username)
+        self.log(f"已输入手机号: {username}")
+        return True
+
+    async def login_with_code(self, username, context, page, form_ready=False, while_waiting=None):
+        """通过短信验证码登录，返回登录后的Cookie字符串，失败返回None"""
+        wait_timeouts = self.wait_timeouts
+        selector_timeout = wait_timeouts["selector"]
+        if form_ready:
+            self.log(f"账号 {username} 的登录页已预热，直接发送验证码")
+        elif not await self.open_login_form(username, page):
+            return None
+
+        # 5. 发送验证码
+        send_code_button = await LOGIN_SELECTORS["send_code_button"].require(page, timeout=selector_timeout)
+        await send_code_button.click()
+        self.log("已点击发送验证码按钮")
+        self.log("等待用户输入验证码...")
+
+        # 6. 弹窗输入验证码
+        verification_code = await self.ask_user(self.app.show_code_dialog, username, while_waiting=while_waiting)
+        if not verification_code:
+            self.log("未获取到验证码，取消登录")
+            return None
+        self.log(f"获取到验证码: {verification_code}")
+
+        # 7. 输入验证码并登录
+        code_input = await LOGIN_SELECTORS["code_input"].require(page, timeout=selector_timeout)
+        await code_input.fill(verification_code)
+        checkbox = await LOGIN_SELECTORS["agree_checkbox"].require(page, timeout=selector_timeout)
+        if not await checkbox.is_checked():
+            await checkbox.check()
+            self.log("已勾选同意条款复选框")
+        submit_button = await LOGIN_SELECTORS["submit_button"].require(page, timeout=selector_timeout)
+        capture = CookieCapture().attach(page) if self.cookie_capture else None
+        await submit_button.click()
+        self.log("已点击登录按钮")
+        self.log("等待登录完成...")
+
+        # 登录成功，获取cookie
+        self.log("登录弹窗已消失，登录成功！")
+        self.log("等待页面跳转和cookie下发...")
+        cookies = await self.wait_for_session_cookies(context, capture, wait_timeouts["login_cookie"])
+        cookie_string = self.build_cookie_string(cookies)
+        if not cookie_string:
+            self.log("无法获取Cookie，登录可能失败")
+            return None
+        self.log(f"登录后获取到的Cookie: {cookie_string}")
+        return cookie_string
+
+    async def wait_for_session_cookies(self, context, capture, timeout):
+        """
+        等待登录后的会话Cookie
+
+        capture不为None时等待user/info响应，响应到达且会话Cookie已写入即返回；
+        未捕获到时（或轮询模式下）改为轮询context.cookies()。
+        """
+        wait_timeouts = self.wait_timeouts
+        names = set(self.session_cookie_names)
+        if capture is not None:
+            cookies, captured = await capture.wait(context, timeout=timeout)
+            if captured and any(c["name"] in names for c in cookies):
+                self.log("已捕获user/info响应，Cookie已就绪")
+                return cookies
+            self.log("未捕获到user/info响应，改为轮询Cookie")
+            timeout = wait_timeouts["cookie_settle"]
+
+        cookies, cookie_ready = await wait_for_cookies(context, names, timeout=timeout)
+        if cookie_ready:
+            # 会话Cookie已下发，再等其余Cookie写完
+            cookies, _ = await wait_for_cookies_settled(context, timeout=wait_timeouts["cookie_settle"])
+        else:
+            self.log(f"等待登录Cookie超时（{timeout}ms），使用当前Cookie")
+        return cookies
+
+    def build_cookie_string(self, cookies):
+        """按Cookie白名单拼接上传的Cookie字符串"""
+        allowlist = self.cookie_allowlist
+        return cookie_header(filter_cookies(cookies, allowlist.get("names"), allowlist.get("domains")))
+
+    async def query_owner_info(self, username, cookie_string, use_cache=True):
+        """
+        请求info接口，返回成功的响应内容，接口返回失败时返回None
+
+        请求本身失败（网络错误、超时或熔断）时抛出OwnerInfoUnavailable。
+        """
+        # 调试：打印 CurlHelper 加载到的 endpoints
+        api_client = self.api
+        self.log(f"当前 CurlHelper endpoints: {api_client.endpoints}")
+        if "info" not in api_client.endpoints:
+            self.log("endpoints 中未找到 'info' key，请检查 curl_config.json 配置！")
+        else:
+            self.log(f"endpoints['info']: {api_client.endpoints['info']}")
+        info_url = api_client.get_endpoint_url("info")
+        self.log(f"实际请求的 info_url: {info_url}")
+        info_result = await api_client.get_owner_info(cookie_string, phone=username, use_cache=use_cache)
+        if "error" in info_result:
+            self.log(f"请求或解析 info 响应出错: {info_result['error']}")
+            raise OwnerInfoUnavailable(info_result["error"])
+        resp_json = info_result["data"]
+        if info_result.get("cached"):
+            self.log("info接口结果来自缓存")
+        else:
+            self.log(f"info接口响应状态码: {info_result['status_code']}")
+        self.log(f"info接口响应内容: {resp_json}")
+        if not isinstance(resp_json, dict) or resp_json.get("code") != 1:
+            self.log(f"info接口返回失败: {resp_json}")
+            return None
+        return resp_json
+
+    async def upload_account(self, username, context, page, cookie_string, resp_json):
+        """
+        按info接口返回的账户列表上传Cookie
+
+        返回上传的账户ID（单一账号为None，多选时为列表），失败返回False。
+        """
+        data = resp_json.get("data", {})
+        account_infos = data.get('accountInfos', [])
+        if not isinstance(account_infos, list):
+            account_infos = []
+        self.log(f"accountInfos长度: {len(account_infos)}")
+        self.log(f"accountInfos内容: {account_infos}")
+        if len(account_infos) == 0:
+            self.log("检测到单一账号，直接上传cookie")
+            await self._blocking(self.app.send_account_info, username, cookie_string)
+            return None
+
+        self.log(f"检测到多个账号，数量: {len(account_infos)}，等待用户选择登录账户")
+        selected_account_ids = await self.ask_user(self.app.show_account_dialog, account_infos, username)
+        if not selected_account_ids:
+            self.log("用户未选择账号，处理中止")
+            return False
+        self.log(f"用户选择了账号ID: {', '.join(str(i) for i in selected_account_ids)}")
+        if len(selected_account_ids) > 1:
+            return await self.harvest_accounts(username, context, selected_account_ids)
+
+        selected_account_id = selected_account_ids[0]
+        # 6. 跳转至对应账户页
+        account_url = self.account_url(selected_account_id)
+        self.log(f"跳转至对应账户页: {account_url}")
+        # 7. 获取新页面cookie：监听账户页的user/info响应，或等待账户页下发的Cookie稳定
+        account_timeout = self.wait_timeouts["account_cookie"]
+        if self.cookie_capture:
+            capture = CookieCapture().attach(page)
+            await page.goto(account_url, wait_until="domcontentloaded")
+            cookies, captured = await capture.wait(context, timeout=account_timeout)
+            if not captured:
+                self.log("未捕获到账户页的user/info响应，等待Cookie稳定")
+                cookies, _ = await wait_for_cookies_settled(context, timeout=account_timeout)
+        else:
+            await page.goto(account_url, wait_until="networkidle")
+            cookies, _ = await wait_for_cookies_settled(context, timeout=account_timeout)
+        new_cookie_string = self.build_cookie_string(cookies)
+        if not new_cookie_string:
+            self.log("跳转后未获取到Cookie")
+            return False
+        self.log(f"跳转后获取新页面Cookie: {new_cookie_string}")
+        # 8. 上传服务器(cookie+account_id+account)
+        await self._blocking(self.app.send_account_info, username, new_cookie_string, selected_account_id)
+        return selected_account_id
+
+    @staticmethod
+    def account_url(account_id):
+        return f"https://niu.e.kuaishou.com/home?__accountId__={account_id}&homeType=new"
+
+    async def harvest_accounts(self, username, context, account_ids):
+        """
+        一次登录上传多个账户的Cookie
+
+        同一个浏览器上下文共用一份Cookie，多个账户页同时跳转会互相覆盖账户Cookie，
+        因此把已登录的会话复制到每个账户各自的上下文中，同时打开账户页，每批最多
+        max_account_pages个。返回上传成功的账户ID列表，全部失败返回False。
+        """
+        state = await context.storage_state()
+        uploaded = []
+        for start in range(0, len(account_ids), self.max_account_pages):
+            if self.stop_event.is_set():
+                break
+            batch = account_ids[start:start + self.max_account_pages]
+            results = await asyncio.gather(*(self.harvest_account(username, state, account_id)
+                                             for account_id in batch))
+            uploaded.extend(account_id for account_id, ok in zip(batch, results) if ok)
+
+        self.log(f"已上传 {len(uploaded)}/{len(account_ids)} 个账户的Cookie")
+        return uploaded or False
+
+    async def harvest_account(self, username, state, account_id):
+        """在复制了登录会话的新上下文中打开账户页并上传Cookie，返回是否成功"""
+        account_timeout = self.wait_timeouts["account_cookie"]
+        context = await self.browser_pool.acquire_context(storage_state=state)
+        try:
+            page = await context.new_page()
+            account_url = self.account_url(account_id)
+            self.log(f"跳转至对应账户页: {account_url}")
+            if self.cookie_capture:
+                capture = CookieCapture().attach(page)
+                await page.goto(account_url, wait_until="commit")
+                cookies, captured = await capture.wait(context, timeout=account_timeout)
+                if not captured:
+                    self.log(f"未捕获到账户 {account_id} 的user/info响应，等待Cookie稳定")
+                    cookies, _ = await wait_for_cookies_settled(context, timeout=account_timeout)
+            else:
+                await page.goto(account_url, wait_until="networkidle")
+                cookies, _ = await wait_for_cookies_settled(context, timeout=account_timeout)
+            new_cookie_string = self.build_cookie_string(cookies)
+            if not new_cookie_string:
+                self.log(f"账户 {account_id} 跳转后未获取到Cookie")
+                return False
+            self.log(f"账户 {account_id} 的Cookie: {new_cookie_string}")
+            await self._blocking(self.app.send_account_info, username, new_cookie_string, account_id)
+            return True
+        except Exception as e:
+            self.log(f"获取账户 {account_id} 的Cookie出错: {e}")
+            return False
+        finally:
+            await self.browser_pool.release_context(context)
+
+    async def ask_user(self, show_dialog, *args, while_waiting=None):
+        """
+        在界面线程中显示对话框并等待用户输入
+
+        show_dialog(future, *args)在界面线程中执行，用户操作后通过future返回结果。
+        多个任务同时需要输入时按顺序逐个显示。对话框显示后调用while_waiting，
+        利用用户输入的时间做其他准备工作。
+        """
+        async with self._dialog_lock:
+            future = self.app.open_dialog(show_dialog, *args)
+            if while_waiting is not None:
+                try:
+                    while_waiting()
+                except Exception as e:
+                    self.log(f"等待用户输入期间的准备工作出错: {e}")
+            return await asyncio.wrap_future(future)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+账号导入 - 逐行读取txt、CSV或JSONL账号文件，分批写入账号库
+"""
+
+import csv
+import json
+import os
+
+# 各列可用的列名（CSV表头或JSONL的键），比较时不区分大小写
+PHONE_KEYS = ("phone", "account", "username", "mobile", "手机号", "账号")
+PASSWORD_KEYS = ("password", "密码")
+ACCOUNT_ID_KEYS = ("accountid", "account_id")
+
+
+def _pick(record, keys):
+    """按候选列名从记录中取值，记录的键已转为小写"""
+    for key in keys:
+        value = record.get(key)
+        if value not in (None, ""):
+            return str(value).strip()
+    return ""
+
+
+class AccountImporter:
+    """
+    流式账号导入
+
+    按行读取文件，不把整个文件读入内存：
+    - txt：每行一个手机号
+    - csv：有表头时按列名（手机号、密码、accountId）取值，没有表头时依次为这三列
+    - jsonl：每行一个JSON对象，键同CSV列名
+    每batch_size条记录在一个事务中写入，依靠手机号主键跳过账号库中已存在和文件中重复的账号。
+    run在后台线程中执行，界面线程可以读取bytes_read、total_bytes和stats显示进度，
+    设置cancel_event后在读取下一条记录前停止，已读取但未提交的记录不再写入。
+    文件中的accountId保存为账号的预选账户。
+    """
+
+    def __init__(self, store, batch_size=1000):
+        self.store = store
+        self.batch_size = batch_size
+        self.bytes_read = 0
+        self.total_bytes = 0
+        self.stats = {"read": 0, "imported": 0, "skipped": 0, "invalid": 0, "cancelled": False}
+
+    @staticmethod
+    def detect_format(path, first_line=""):
+        ext = os.path.splitext(path)[1].lower()
+        if ext in (".jsonl", ".ndjson"):
+            return "jsonl"
+        if ext == ".csv":
+            return "csv"
+        if first_line.lstrip().startswith("{"):
+            return "jsonl"
+        return "txt"
+
+    def _lines(self, f):
+        """逐行读取并记录已读取的字节数"""
+        for raw in f:
+            self.bytes_read += len(raw)
+            # utf-8-sig去掉Excel等软件写入的BOM
+            yield raw.decode("utf-8-sig", errors="replace")
+
+    def _records(self, path, f):
+        """逐条返回 (手机号, 密码, accountId)，无法解析的行返回None"""
+        lines = self._lines(f)
+        first_line = next(lines, None)
+        if first_line is None:
+            return
+        fmt = self.detect_format(path, first_line)
+
+        def all_lines():
+            yield first_line
+            yield from lines
+
+        if fmt == "jsonl":
+            for line in all_lines():
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    yield None
+                    continue
+                if not isinstance(record, dict):
+                    yield None
+                    continue
+                record = {str(key).lower(): value for key, value in record.items()}
+                yield _pick(record, PHONE_KEYS), _pick(record, PASSWORD_KEYS), _pick(record, ACCOUNT_ID_KEYS)
+        elif fmt == "csv":
+            reader = csv.reader(all_lines())
+            header = None
+            first_row = True
+            for row in reader:
+                row = [cell.strip() for cell in row]
+                if not any(row):
+                    continue
+                if first_row:
+                    first_row = False
+                    names = [cell.lower() for cell in row]
+                    if any(name in PHONE_KEYS for name in names):
+                        header = names
+                        continue
+                if header:
+                    record = dict(zip(header, row))
+                    yield _pick(record, PHONE_KEYS), _pick(record, PASSWORD_KEYS), _pick(record, ACCOUNT_ID_KEYS)
+                else:
+                    row += [""] * (3 - len(row))
+                    yield row[0], row[1], row[2]
+        else:
+            for line in all_lines():
+                phone = line.strip()
+                if phone:
+                    yield phone, "", ""
+
+    def _commit(self, batch):
+        imported = self.store.add_many(batch)
+        self.stats["imported"] += imported
+        self.stats["skipped"] += len(batch) - imported
+
+    def run(self, path, cancel_event=None):
+        """导入文件，返回统计 {"read", "imported", "skipped", "invalid", "cancelled"}"""
+        self.total_bytes = os.path.getsize(path)
+        batch = []
+        with open(path, "rb") as f:
+            for record in self._records(path, f):
+                if cancel_event is not None and cancel_event.is_set():
+                    self.stats["cancelled"] = True
+                    return self.stats
+                self.stats["read"] += 1
+                if record is None or not record[0]:
+                    self.stats["invalid"] += 1
+                    continue
+                phone, password, account_id = record
+                batch.append((phone, password, account_id or None))
+                if len(batch) >= self.batch_size:
+                    self._commit(batch)
+                    batch = []
+        if cancel_event is not None and cancel_event.is_set():
+            self.stats["cancelled"] = True
+            return self.stats
+        if batch:
+            self._commit(batch)
+        return self.stats
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+账号列表控件 - 只为可见的行创建Treeview项，账号数量很大时界面仍然流畅
+"""
+
+import tkinter as tk
+from tkinter import ttk
+
+
+class AccountListModel:
+    """账号列表的数据，按添加顺序保存每个手机号显示的内容和选中状态"""
+
+    def __init__(self):
+        self.phones = []
+        self.selected = set()
+        self._index = {}
+        self._values = {}
+
+    def __len__(self):
+        return len(self.phones)
+
+    def __contains__(self, phone):
+        return phone in self._values
+
+    def index(self, phone):
+        return self._index[phone]
+
+    def values(self, phone):
+        return self._values[phone]
+
+    def update(self, phone, values):
+        """新增或修改一行，返回是否有变化"""
+        if phone not in self._values:
+            self._index[phone] = len(self.phones)
+            self.phones.append(phone)
+        elif self._values[phone] == values:
+            return False
+        self._values[phone] = values
+        return True
+
+    def remove_many(self, phones):
+        """删除多行，返回是否有变化"""
+        phones = {phone for phone in phones if phone in self._values}
+        if not phones:
+            return False
+        for phone in phones:
+            del self._values[phone]
+            self.selected.discard(phone)
+        self.phones = [phone for phone in self.phones if phone not in phones]
+        self._index = {phone: i for i, phone in enumerate(self.phones)}
+        return True
+
+    def rows(self, start, stop):
+        """返回 [(手机号, 显示内容)]"""
+        return [(phone, self._values[phone]) for phone in self.phones[start:stop]]
+
+
+class VirtualAccountList(ttk.Frame):
+    """
+    虚拟化的账号列表
+
+    Treeview中只保留可见的几十个项，滚动时用AccountListModel中对应位置的数据重新填充，
+    内存占用和滚动速度与账号总数无关。选中状态保存在模型中，点击、Ctrl多选、Shift
+    连选和键盘翻页都由本控件处理。数据变化后调用render刷新。
+    """
+
+    def __init__(self, master, columns, model=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.model = model or AccountListModel()
+        self.offset = 0
+        self.visible_rows = 20
+        # 默认行高和表头高度，首次显示后按实际大小校准
+        self.row_height = 20
+        self.heading_height = 24
+        self._calibrated = False
+        self._items = []
+        self._item_phones = {}
+        self._anchor = None
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", selectmode="none")
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=100)
+        style = ttk.Style()
+        self.tree.tag_configure(
+            "selected",
+            background=style.lookup("Treeview", "background", ["selected"]) or "#0078d7",
+            foreground=style.lookup("Treeview", "foreground", ["selected"]) or "#ffffff"
+        )
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+        self.tree.bind("<Button-1>", self._on_click)
+        self.tree.bind("<Control-Button-1>", lambda event: self._on_click(event, toggle=True))
+        self.tree.bind("<Shift-Button-1>", lambda event: self._on_click(event, extend=True))
+        self.tree.bind("<Prior>", lambda event: self.scroll(-self.visible_rows))
+        self.tree.bind("<Next>", lambda event: self.scroll(self.visible_rows))
+        self.tree.bind("<Up>", lambda event: self.scroll(-1))
+        self.tree.bind("<Down>", lambda event: self.scroll(1))
+        self.tree.bind("<Home>", lambda event: self.scroll_to(0))
+        self.tree.bind("<End>", lambda event: self.scroll_to(len(self.model)))
+        self.tree.bind("<Control-a>", self._on_select_all)
+
+    def _on_configure(self, event):
+        visible_rows = max(1, (event.height - self.heading_height) // self.row_height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.render()
+
+    def _calibrate(self):
+        """按第一行的实际位置校准行高和表头高度"""
+        if self._calibrated or not self._items:
+            return
+        bbox = self.tree.bbox(self._items[0])
+        if not bbox:
+            return
+        self._calibrated = True
+        if (bbox[1], bbox[3]) != (self.heading_height, self.row_height):
+            self.heading_height, self.row_height = bbox[1], bbox[3]
+            self.visible_rows = max(1, (self.tree.winfo_height() - self.heading_height) // self.row_height)
+            self.render()
+
+    def render(self):
+        """用模型中当前窗口的数据填充可见的行"""
+        count = len(self.model)
+        self.offset = max(0, min(self.offset, count - self.visible_rows))
+        rows = self.model.rows(self.offset, self.offset + self.visible_rows)
+
+        while len(self._items) < len(rows):
+            self._items.append(self.tree.insert("", tk.END, values=()))
+        while len(self._items) > len(rows):
+            self.tree.delete(self._items.pop())
+
+        self._item_phones = {}
+        for item, (phone, values) in zip(self._items, rows):
+            tags = ("selected",) if phone in self.model.selected else ()
+            self.tree.item(item, values=values, tags=tags)
+            self._item_phones[item] = phone
+
+        if count:
+            self.scrollbar.set(self.offset / count, (self.offset + len(rows)) / count)
+        else:
+            self.scrollbar.set(0, 1)
+        if not self._calibrated and self._items:
+            self.after_idle(self._calibrate)
+
+    def yview(self, *args):
+        """滚动条回调"""
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.model)))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            self.scroll(amount * self.visible_rows if args[2] == "pages" else amount)
+
+    def scroll(self, rows):
+        self.scroll_to(self.offset + rows)
+        return "break"
+
+    def scroll_to(self, offset):
+        self.offset = offset
+        self.render()
+        return "break"
+
+    def _on_mousewheel(self, event):
+        # Windows上delta为120的倍数，macOS上为较小的整数
+        step = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self.scroll(-3 * step)
+
+    def identify_phone(self, y):
+        """返回y坐标处的手机号"""
+        return self._item_phones.get(self.tree.identify_row(y))
+
+    def _on_click(self, event, toggle=False, extend=False):
+        # 表头和列分隔线交给Treeview默认处理，保留调整列宽等操作
+        if self.tree.identify_region(event.x, event.y) not in ("cell", "tree"):
+            return None
+        self.tree.focus_set()
+        phone = self.identify_phone(event.y)
+        if phone is None:
+            return "break"
+        selected = self.model.selected
+        if extend and self._anchor in self.model:
+            start, stop = sorted((self.model.index(self._anchor), self.model.index(phone)))
+            selected.clear()
+            selected.update(self.model.phones[start:stop + 1])
+        elif toggle:
+            selected.symmetric_difference_update({phone})
+            self._anchor = phone
+        else:
+            selected.clear()
+            selected.add(phone)
+            self._anchor = phone
+        self.render()
+        return "break"
+
+    def _on_select_all(self, event=None):
+        self.model.selected.update(self.model.phones)
+        self.render()
+        return "break"
+
+    def select(self, phone):
+        """右键菜单等场景下选中单个手机号（已在选中范围内时保持不变）"""
+        if phone not in self.model.selected:
+            self.model.selected.clear()
+            self.model.selected.add(phone)
+            self._anchor = phone
+            self.render()
+
+    def selection(self):
+        """按列表顺序返回选中的手机号"""
+        selected = self.model.selected
+        if not selected:
+            return []
+        return sorted(selected, key=self.model.index)
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+账号库 - 用SQLite保存账号列表和处理状态
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import time
+
+from jsonl_log import read_entries
+
+STATUS_PENDING = "pending"
+STATUS_PROCESSED = "processed"
+# 发件箱中的记录被服务器拒绝，需要重新处理
+STATUS_UPLOAD_FAILED = "upload_failed"
+
+# 界面上显示的状态名称
+STATUS_LABELS = {STATUS_PENDING: "未处理", STATUS_PROCESSED: "已处理", STATUS_UPLOAD_FAILED: "上传失败"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    phone TEXT PRIMARY KEY,
+    password TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT 'pending',
+    processed_at TEXT,
+    account_id TEXT,
+    cookie_fingerprint TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_accounts_status ON accounts (status);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def load_legacy_processed(processed_file):
+    """
+    只读地读取旧版已处理记录，不创建或修改任何文件
+
+    旧版记录保存在processed_accounts.json（手机号 -> 记录），部分版本还会在同名的
+    .journal文件中追加 {"op": "set"|"del", "username", "record"} 操作，按顺序重放。
+    """
+    records = {}
+    if os.path.exists(processed_file):
+        try:
+            with open(processed_file, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            if isinstance(snapshot, dict):
+                records = snapshot
+        except (OSError, ValueError) as e:
+            print(f"加载已处理账号失败: {e}")
+
+    for entry in read_entries(os.path.splitext(processed_file)[0] + ".journal"):
+        if entry.get("op") == "set":
+            records[entry["username"]] = entry["record"]
+        elif entry.get("op") == "del":
+            records.pop(entry["username"], None)
+    return records
+
+
+class AccountStore:
+    """
+    SQLite账号库
+
+    每个手机号一行，记录处理状态（按状态建索引）、最后处理时间、选择的accountId
+    和最后上传Cookie的指纹。界面线程和处理引擎的线程池共用一个连接，通过锁串行访问。
+    """
+
+    def __init__(self, path="accounts.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+    def add(self, phone, password=""):
+        """添加账号，已存在时返回False"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO accounts (phone, password, created_at) VALUES (?, ?, ?)",
+                (phone, password, time.time())
+            )
+            return cursor.rowcount > 0
+
+    def add_many(self, rows):
+        """
+        在一个事务中批量添加 (手机号, 密码) 或 (手机号, 密码, accountId) 记录，
+        跳过已存在的，返回新增数量
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO accounts (phone, password, account_id, created_at) VALUES (?, ?, ?, ?)",
+                ((row[0], row[1], row[2] if len(row) > 2 else None, now) for row in rows)
+            )
+            return self._conn.total_changes - before
+
+    def remove_many(self, phones):
+        """在一个事务中删除多个账号"""
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM accounts WHERE phone = ?", ((phone,) for phone in phones))
+
+    def list_accounts(self):
+        """按添加顺序返回所有账号"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT phone, password, status, processed_at, account_id FROM accounts ORDER BY rowid"
+            ).fetchall()
+
+    def get_many(self, phones):
+        """返回指定手机号的账号，不存在的手机号不在结果中"""
+        phones = list(phones)
+        rows = []
+        with self._lock:
+            # SQLite单条语句的参数个数有上限，分批查询
+            for start in range(0, len(phones), 500):
+                chunk = phones[start:start + 500]
+                rows.extend(self._conn.execute(
+                    "SELECT phone, password, status, processed_at, account_id FROM accounts "
+                    f"WHERE phone IN ({','.join('?' * len(chunk))})", chunk
+                ))
+        return rows
+
+    def pending_accounts(self):
+        """返回未处理的账号 (手机号, 密码) 列表"""
+        with self._lock:
+            return [tuple(row) for row in self._conn.execute(
+                "SELECT phone, password FROM accounts WHERE status != ? ORDER BY rowid", (STATUS_PROCESSED,)
+            )]
+
+    def get(self, phone):
+        with self._lock:
+            return self._conn.execute("SELECT * FROM accounts WHERE phone = ?", (phone,)).fetchone()
+
+    def mark_processed(self, phone, processed_at=None):
+        """标记账号已处理，本次处理中已有上传被拒绝的账号保持上传失败"""
+        processed_at = processed_at or time.strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE accounts SET status = ?, processed_at = ? WHERE phone = ? AND status != ?",
+                (STATUS_PROCESSED, processed_at, phone, STATUS_UPLOAD_FAILED)
+            )
+
+    def mark_upload_failed(self, phone):
+        """标记账号的上传被服务器拒绝"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE accounts SET status = ?, processed_at = ? WHERE phone = ?",
+                (STATUS_UPLOAD_FAILED, time.strftime("%Y-%m-%d %H:%M:%S"), phone)
+            )
+
+    def reset_upload_failed(self, phone):
+        """重新处理前清除上传失败状态"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE accounts SET status = ? WHERE phone = ? AND status = ?",
+                (STATUS_PENDING, phone, STATUS_UPLOAD_FAILED)
+            )
+
+    def record_upload(self, phone, account_id=None, cookie_fingerprint=None):
+        """记录上传的accountId和Cookie指纹"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE accounts SET account_id = COALESCE(?, account_id), cookie_fingerprint = ? WHERE phone = ?",
+                (None if account_id is None else str(account_id), cookie_fingerprint, phone)
+            )
+
+    def clear_processed(self):
+        """把所有账号恢复为未处理"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE accounts SET status = ?, processed_at = NULL WHERE status != ?",
+                (STATUS_PENDING, STATUS_PENDING)
+            )
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def migrate_legacy(self, accounts_dir, processed_file, log=print):
+        """
+        一次性导入旧版数据
+
+        旧版每个账号一个accounts/<手机号>.txt文件，处理状态保存在processed_accounts.json
+        （及其日志）中。导入完成后在meta表中记录，之后不再重复导入；旧文件保留不删除。
+        """
+        if self.get_meta("legacy_migrated"):
+            return 0
+
+        phones = []
+        if os.path.isdir(accounts_dir):
+            for entry in sorted(os.scandir(accounts_dir), key=lambda e: e.name):
+                if not entry.name.endswith(".txt"):
+                    continue
+                try:
+                    with open(entry.path, "r", encoding="utf-8") as f:
+                        phone = f.readline().strip()
+                except OSError as e:
+                    log(f"读取账号文件 {entry.name} 失败: {e}")
+                    continue
+                if phone:
+                    phones.append(phone)
+
+        processed = load_legacy_processed(processed_file)
+
+        # 已处理但没有账号文件的手机号也一并导入，保留其处理状态
+        known = set(phones)
+        phones.extend(phone for phone in processed if phone not in known)
+        added = self.add_many((phone, "") for phone in phones)
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "UPDATE accounts SET status = ?, processed_at = ? WHERE phone = ?",
+                ((STATUS_PROCESSED, (record if isinstance(record, dict) else {}).get("time") or None, phone)
+                 for phone, record in processed.items())
+            )
+            updated = self._conn.total_changes - before
+        self.set_meta("legacy_migrated", time.strftime("%Y-%m-%d %H:%M:%S"))
+        if phones:
+            log(f"已从旧版数据导入 {added} 个账号，{updated} 条已处理记录")
+        return added
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+异步API请求工具 - CurlHelper的asyncio版本
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from curl_helper import CurlHelper
+
+
+class AsyncCurlHelper:
+    """
+    异步API客户端
+
+    与CurlHelper使用同一份curl_config.json和同样的get/post/upload_cookies接口，
+    请求在共享连接池上执行，同时进行的请求数不超过max_in_flight。传入client时与其共用
+    连接池和缓存，close只关闭线程池，不关闭传入的client。
+    """
+
+    def __init__(self, config_file="curl_config.json", max_in_flight=None, client=None, verbose=True):
+        """初始化异步API客户端"""
+        self._owns_client = client is None
+        self.client = client or CurlHelper(config_file, verbose=verbose)
+        self.config = self.client.config
+        self.base_url = self.client.base_url
+        self.endpoints = self.client.endpoints
+        self.timeout = self.client.timeout
+
+        if max_in_flight is None:
+            max_in_flight = self.config.get("max_in_flight", self.client.pool.maxsize)
+        self.max_in_flight = max(1, int(max_in_flight))
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_in_flight,
+            thread_name_prefix="AsyncCurlHelper"
+        )
+        self._semaphores = {}
+        if verbose:
+            print(f"异步API客户端最大并发请求数: {self.max_in_flight}")
+
+    def _semaphore(self):
+        """获取当前事件循环对应的并发限制信号量"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def _call(self, func, *args, **kwargs):
+        """在工作线程中执行同步请求，不阻塞事件循环"""
+        async with self._semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    def get_endpoint_url(self, endpoint_name):
+        """获取完整的API端点URL"""
+        return self.client.get_endpoint_url(endpoint_name)
+
+    async def get(self, endpoint_name, params=None, headers=None):
+        """发送GET请求"""
+        return await self._call(self.client.get, endpoint_name, params=params, headers=headers)
+
+    async def post(self, endpoint_name, data=None, json_data=None, headers=None):
+        """发送POST请求"""
+        return await self._call(self.client.post, endpoint_name, data=data, json_data=json_data, headers=headers)
+
+    async def upload_cookies(self, account, cookies, account_id=None, timestamp=None, idempotency_key=None):
+        """上传账号Cookie到API"""
+        return await self._call(self.client.upload_cookies, account, cookies, account_id,
+                                timestamp=timestamp, idempotency_key=idempotency_key)
+
+    async def upload_cookies_batch(self, records):
+        """批量上传账号Cookie到API"""
+        return await self._call(self.client.upload_cookies_batch, records)
+
+    async def get_owner_info(self, cookies, phone=None, use_cache=True):
+        """查询Cookie对应的OwnerInfo，结果与CurlHelper共用缓存"""
+        return await self._call(self.client.get_owner_info, cookies, phone=phone, use_cache=use_cache)
+
+    async def close(self):
+        """关闭客户端，等待进行中的请求结束"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, partial(self._executor.shutdown, wait=True))
+        if self._owns_client:
+            self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+# 测试代码
+if __name__ == "__main__":
+    async def main():
+        async with AsyncCurlHelper() as api:
+            print(f"已加载API配置: {api.base_url}")
+            print(f"可用端点: {list(api.endpoints.keys())}")
+
+    asyncio.run(main())
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+浏览器池 - 复用长期运行的Chromium进程，为每个账号创建独立的浏览器上下文
+"""
+
+import asyncio
+
+
+class ResourceFilter:
+    """
+    资源过滤器
+
+    通过context.route拦截请求，按资源类型（图片、字体、媒体等）和URL关键字屏蔽
+    不需要的请求，登录表单依赖的脚本和接口请求照常放行。
+    """
+
+    # 常见统计、埋点请求的URL关键字
+    DEFAULT_ANALYTICS_PATTERNS = (
+        "hm.baidu.com",
+        "google-analytics.com",
+        "googletagmanager.com",
+        "log-sdk.ksapisrv.com",
+        "/rest/wd/common/log/collect",
+        "/log/collect",
+        "weblogger",
+    )
+
+    def __init__(self, resource_types=None, url_patterns=None):
+        self.resource_types = set(resource_types or ())
+        self.url_patterns = tuple(url_patterns or ())
+
+    @classmethod
+    def from_config(cls, config):
+        """从浏览器配置创建过滤器，没有需要屏蔽的内容时返回None"""
+        resource_types = config.get("block_resources", [])
+        url_patterns = list(config.get("block_url_patterns", []))
+        if config.get("block_analytics", False):
+            url_patterns.extend(cls.DEFAULT_ANALYTICS_PATTERNS)
+        if not resource_types and not url_patterns:
+            return None
+        return cls(resource_types, url_patterns)
+
+    def should_block(self, resource_type, url):
+        """是否屏蔽该请求"""
+        if resource_type in self.resource_types:
+            return True
+        return any(pattern in url for pattern in self.url_patterns)
+
+    async def handle(self, route):
+        """route回调"""
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def install(self, context):
+        """为浏览器上下文安装过滤器"""
+        await context.route("**/*", self.handle)
+
+
+class BrowserPool:
+    """
+    浏览器池
+
+    基于Playwright异步API，只能在创建它的事件循环中使用，同一循环中的多个任务可以
+    共用一个浏览器池。每个账号通过acquire_context获取一个全新的上下文（Cookie、缓存
+    互不共享），同一浏览器创建的上下文达到recycle_after个或浏览器崩溃后，自动换用
+    新的浏览器进程。
+    """
+
+    def __init__(self, executable_path=None, headless=False, recycle_after=20, launch_options=None,
+                 resource_filter=None, log=print):
+        self.executable_path = executable_path
+        self.headless = headless
+        self.resource_filter = resource_filter
+        self.recycle_after = max(1, int(recycle_after))
+        self.launch_options = launch_options or {}
+        self.log = log
+
+        self.playwright = None
+        self._browser = None
+        self._browser_uses = 0
+        self._open_contexts = {}
+        self._retired = set()
+        # 多个任务同时需要浏览器时只启动一个
+        self._launch_lock = None
+
+    async def start(self):
+        """启动Playwright驱动"""
+        if self.playwright is None:
+            from playwright.async_api import async_playwright
+
+            self.playwright = await async_playwright().start()
+        return self
+
+    async def _launch(self):
+        """启动新的浏览器进程"""
+        await self.start()
+        options = dict(self.launch_options)
+        options["headless"] = self.headless
+        if self.executable_path:
+            options["executable_path"] = self.executable_path
+        browser = await self.playwright.chromium.launch(**options)
+        browser.on("disconnected", lambda _: self._on_disconnected(browser))
+        self.log("已启动浏览器")
+        return browser
+
+    def _on_disconnected(self, browser):
+        """浏览器进程退出或崩溃"""
+        if browser is self._browser:
+            self.log("浏览器已断开，下一个账号将使用新的浏览器")
+            self._browser = None
+        self._retired.discard(browser)
+
+    async def _current_browser(self):
+        """获取可用的浏览器，必要时启动新的"""
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+        async with self._launch_lock:
+            browser = self._browser
+            if browser is not None and (not browser.is_connected() or self._browser_uses >= self.recycle_after):
+                await self._retire(browser)
+                browser = None
+            if browser is None:
+                browser = await self._launch()
+                self._browser = browser
+                self._browser_uses = 0
+            # 在锁内计数，同时创建的上下文不会超过recycle_after
+            self._browser_uses += 1
+            return browser
+
+    async def _retire(self, browser):
+        """停止使用该浏览器，没有打开的上下文时立即关闭"""
+        if browser is self._browser:
+            self._browser = None
+        if any(owner is browser for owner in self._open_contexts.values()):
+            self._retired.add(browser)
+            return
+        await self._close_browser(browser)
+
+    async def _close_browser(self, browser):
+        self._retired.discard(browser)
+        try:
+            if browser.is_connected():
+                await browser.close()
+                self.log("浏览器已关闭")
+        except Exception as e:
+            self.log(f"关闭浏览器时出错: {e}")
+
+    async def acquire_context(self, **context_options):
+        """获取一个新的浏览器上下文"""
+        browser = await self._current_browser()
+        try:
+            context = await browser.new_context(**context_options)
+        except Exception as e:
+            # 浏览器可能已经崩溃，换一个新的浏览器重试一次
+            self.log(f"创建浏览器上下文失败，重启浏览器: {e}")
+            await self._retire(browser)
+            browser = await self._current_browser()
+            context = await browser.new_context(**context_options)
+        self._open_contexts[context] = browser
+        if self.resource_filter is not None:
+            await self.resource_filter.install(context)
+        return context
+
+    async def release_context(self, context):
+        """关闭上下文，所属浏览器已退役时一并关闭"""
+        browser = self._open_contexts.pop(context, None)
+        try:
+            await context.close()
+        except Exception as e:
+            self.log(f"关闭浏览器上下文时出错: {e}")
+        if browser is None:
+            return
+        if browser in self._retired and not any(owner is browser for owner in self._open_contexts.values()):
+            await self._close_browser(browser)
+        elif browser is self._browser and self._browser_uses >= self.recycle_after:
+            await self._retire(browser)
+
+    async def close(self):
+        """关闭所有上下文、浏览器和Playwright驱动"""
+        for context in list(self._open_contexts):
+            await self.release_context(context)
+        for browser in [self._browser] + list(self._retired):
+            if browser is not None:
+                await self._close_browser(browser)
+        self._browser = None
+        if self.playwright is not None:
+            try:
+                await self.playwright.stop()
+            except Exception as e:
+                self.log(f"关闭Playwright时出错: {e}")
+            self.playwright = None
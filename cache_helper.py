@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+缓存工具 - 带过期时间和LRU淘汰的线程安全缓存
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """带过期时间的LRU缓存，超过maxsize时淘汰最久未使用的项"""
+
+    def __init__(self, maxsize=1024, ttl=600):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    def get(self, key, default=None):
+        """读取缓存，过期或不存在时返回default"""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._items[key]
+                return default
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """写入缓存"""
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._items[key] = (time.monotonic() + ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+
+def cookie_fingerprint(cookie_string):
+    """计算Cookie字符串的指纹，与Cookie的先后顺序无关"""
+    parts = sorted(part.strip() for part in (cookie_string or "").split(";") if part.strip())
+    return hashlib.sha256("; ".join(parts).encode("utf-8")).hexdigest()
@@ -5,16 +5,138 @@ API请求工具 - 处理API请求和响应
 
 import os
 import json
-import requests
 import time
+import uuid
+import gzip
+import hashlib
+import zlib
 from urllib.parse import urljoin
-import urllib.request
-import urllib.error
+import urllib.parse
+from http_pool import ConnectionPool
+from retry_helper import RetryPolicy, CircuitBreaker, parse_retry_after
+from cache_helper import TTLCache, cookie_fingerprint
+from metrics_helper import MetricsRegistry
+
+# 幂等键请求头，同一次调用的所有重试使用相同的值
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# 支持的压缩格式
+SUPPORTED_ENCODINGS = ("gzip", "deflate")
+
+
+def compress_body(body, encoding):
+    """按指定格式压缩请求体"""
+    if encoding == "gzip":
+        return gzip.compress(body)
+    if encoding == "deflate":
+        return zlib.compress(body)
+    raise ValueError(f"不支持的压缩格式: {encoding}")
+
+
+def _decompress_limited(data, wbits, max_size):
+    decompressor = zlib.decompressobj(wbits)
+    body = decompressor.decompress(data, max_size or 0)
+    # 解压结果超过上限时未处理完的输入留在unconsumed_tail中
+    return body, bool(decompressor.unconsumed_tail)
+
+
+def decompress_body(data, encoding, max_size=None):
+    """
+    按Content-Encoding解压响应体，未压缩时原样返回
+
+    解压结果最多max_size字节（None或0不限制），返回 (响应体, 是否截断)。
+    压缩数据本身不完整时返回已能解压的部分，不报错。
+    """
+    encoding = (encoding or "").strip().lower()
+    if encoding == "gzip":
+        return _decompress_limited(data, 16 + zlib.MAX_WBITS, max_size)
+    if encoding == "deflate":
+        try:
+            return _decompress_limited(data, zlib.MAX_WBITS, max_size)
+        except zlib.error:
+            # 部分服务端返回不带zlib头的原始deflate数据
+            return _decompress_limited(data, -zlib.MAX_WBITS, max_size)
+    return data, False
+
+
+class ApiResponse:
+    """
+    API响应
+
+    保存原始响应体，只在访问data、text或headers时才解码，兼容原先结果字典的
+    "status_code"、"data"、"text"、"headers"键访问方式。
+    """
+
+    __slots__ = ("status_code", "body", "truncated", "_raw_headers", "_headers", "_text", "_data")
+
+    _UNSET = object()
+
+    def __init__(self, status_code, body, raw_headers, truncated=False):
+        self.status_code = status_code
+        self.body = body
+        self.truncated = truncated
+        self._raw_headers = raw_headers
+        self._headers = None
+        self._text = None
+        self._data = self._UNSET
+
+    @property
+    def headers(self):
+        """响应头字典"""
+        if self._headers is None:
+            self._headers = dict(self._raw_headers)
+        return self._headers
+
+    @property
+    def text(self):
+        """响应体文本"""
+        if self._text is None:
+            self._text = self.body.decode('utf-8', errors='replace')
+        return self._text
+
+    @property
+    def data(self):
+        """解析后的JSON数据，响应体不是JSON时为None"""
+        if self._data is self._UNSET:
+            try:
+                self._data = json.loads(self.body)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                self._data = None
+        return self._data
+
+    def is_json(self):
+        return self.data is not None
+
+    def keys(self):
+        return ["status_code", "data" if self.is_json() else "text", "headers"]
+
+    def __contains__(self, key):
+        if key == "data":
+            return self.is_json()
+        if key == "text":
+            return not self.is_json()
+        return key in ("status_code", "headers")
+
+    def __getitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        return getattr(self, key)
+
+    def __repr__(self):
+        return f"ApiResponse(status_code={self.status_code}, bytes={len(self.body)}, truncated={self.truncated})"
 
 
 class CurlHelper:
-    def __init__(self, config_file="curl_config.json"):
-        """初始化API客户端"""
+    def __init__(self, config_file="curl_config.json", verbose=True):
+        """初始化API客户端，verbose为False时不打印配置信息"""
         self.config = self.load_config(config_file)
         self.base_url = self.config.get("base_url", "")
         # 强制将HTTPS改为HTTP
@@ -23,15 +145,62 @@ class CurlHelper:
             print(f"已将基础URL转换为HTTP: {self.base_url}")
         self.default_headers = self.config.get("default_headers", {})
         self.timeout = self.config.get("timeout", 30)
+        self.max_body = self.config.get("max_body", 1024 * 1024)
         self.endpoints = self.config.get("endpoints", {})
+        self.batch_config = self.config.get("batch", {})
+        self.compression_config = self.config.get("compression", {})
+        self._uncompressed_endpoints = set()
+
+        # 长连接池，所有请求共享，不修改urllib的全局opener
+        pool_config = self.config.get("pool", {})
+        self.pool = ConnectionPool(
+            maxsize=pool_config.get("maxsize", 8),
+            timeout=self.timeout,
+            dns_ttl=pool_config.get("dns_ttl", 300),
+            idle_timeout=pool_config.get("idle_timeout", 60)
+        )
+
+        # 按端点统计请求数、字节数、状态码和延迟
+        self.metrics_config = self.config.get("metrics", {})
+        self.metrics = MetricsRegistry(window=self.metrics_config.get("window", 2048))
+        self.pool.dns_cache.on_resolve = self._record_dns
+
+        # OwnerInfo查询结果缓存，按Cookie指纹和手机号索引
+        owner_cache_config = self.config.get("owner_info_cache", {})
+        self.owner_info_cache = TTLCache(
+            maxsize=owner_cache_config.get("maxsize", 1024),
+            ttl=owner_cache_config.get("ttl", 600)
+        )
+
+        # 重试策略和熔断器
+        self.retry_config = self.config.get("retry", {})
+        self._retry_policies = {}
+        breaker_config = self.config.get("circuit_breaker", {})
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=breaker_config.get("failure_threshold", 5),
+            recovery_timeout=breaker_config.get("recovery_timeout", 30)
+        )
 
         # 打印配置信息
+        if verbose:
+            self.print_config(config_file)
+
+    def print_config(self, config_file):
+        """打印配置信息"""
         print("\n=== API客户端配置信息 ===")
         print(f"配置文件: {config_file}")
         print(f"基础URL: {self.base_url}")
         print(f"API端点: {self.endpoints}")
         print(f"超时设置: {self.timeout}秒")
+        print(f"响应体上限: {self.max_body}字节")
         print(f"默认请求头: {self.default_headers}")
+        print(f"连接池设置: {self.config.get('pool', {})}")
+        print(f"批量上传设置: {self.batch_config}")
+        print(f"压缩设置: {self.compression_config}")
+        print(f"重试设置: {self.retry_config}")
+        print(f"OwnerInfo缓存设置: {self.config.get('owner_info_cache', {})}")
+        print(f"统计设置: {self.metrics_config}")
+        print(f"熔断设置: {self.config.get('circuit_breaker', {})}")
         print("=== SSL相关信息 ===")
         try:
             import ssl
@@ -51,6 +220,54 @@ class CurlHelper:
                     "User-Agent": "KwaiTool/1.0"
                 },
                 "timeout": 30,
+                "max_body": 1048576,
+                "pool": {
+                    "maxsize": 8,
+                    "dns_ttl": 300,
+                    "idle_timeout": 60
+                },
+                "max_in_flight": 8,
+                "batch": {
+                    "max_records": 50,
+                    "max_bytes": 262144,
+                    "per_record": False
+                },
+                "retry": {
+                    "max_attempts": 3,
+                    "base_delay": 0.5,
+                    "max_delay": 10,
+                    "jitter": 0.5,
+                    "retry_statuses": [408, 429, 500, 502, 503, 504],
+                    "endpoints": {
+                        "account": {
+                            "max_attempts": 5,
+                            "base_delay": 1
+                        }
+                    }
+                },
+                "circuit_breaker": {
+                    "failure_threshold": 5,
+                    "recovery_timeout": 30
+                },
+                "compression": {
+                    "accept": True,
+                    "min_size": 1024,
+                    "endpoints": {}
+                },
+                "metrics": {
+                    "path": "api_metrics.jsonl",
+                    "window": 2048
+                },
+                "owner_info_cache": {
+                    "maxsize": 1024,
+                    "ttl": 600
+                },
+                "outbox": {
+                    "path": "upload_outbox.jsonl",
+                    "compact_threshold": 100,
+                    "retry_delay": 5,
+                    "max_retry_delay": 300
+                },
                 "endpoints": {
                     "login": "/login",
                     "account": "/index.php/admin/Dashboard/account",
@@ -86,6 +303,133 @@ class CurlHelper:
 
         return urljoin(self.base_url, endpoint)
 
+    def _record_dns(self, host, latency, error):
+        """记录DNS解析耗时"""
+        self.metrics.record("dns", type(error).__name__ if error else "resolved", latency, error=error is not None)
+
+    def get_metrics(self):
+        """返回各端点的请求统计，延迟单位为毫秒"""
+        return self.metrics.snapshot()
+
+    def dump_metrics(self, path=None):
+        """将请求统计追加写入JSONL文件，返回写入的统计"""
+        path = path or self.metrics_config.get("path", "api_metrics.jsonl")
+        return self.metrics.dump(path)
+
+    def get_retry_policy(self, endpoint_name=None):
+        """获取端点的重试策略，端点配置覆盖默认配置"""
+        policy = self._retry_policies.get(endpoint_name)
+        if policy is None:
+            retry_config = dict(self.retry_config)
+            endpoint_overrides = retry_config.pop("endpoints", {})
+            retry_config.update(endpoint_overrides.get(endpoint_name, {}))
+            policy = RetryPolicy.from_config(retry_config)
+            self._retry_policies[endpoint_name] = policy
+        return policy
+
+    def _compress_request(self, endpoint_name, body, headers):
+        """按端点配置压缩请求体并设置相关请求头"""
+        if self.compression_config.get("accept", True):
+            headers.setdefault("Accept-Encoding", ", ".join(SUPPORTED_ENCODINGS))
+
+        encoding = self.compression_config.get("endpoints", {}).get(endpoint_name)
+        if not body or encoding not in SUPPORTED_ENCODINGS or endpoint_name in self._uncompressed_endpoints:
+            return body
+        if len(body) < self.compression_config.get("min_size", 1024):
+            return body
+
+        compressed = compress_body(body, encoding)
+        if len(compressed) >= len(body):
+            return body
+        headers["Content-Encoding"] = encoding
+        return compressed
+
+    def _request(self, method, url, body=None, headers=None, endpoint_name=None):
+        """
+        通过连接池发送请求并整理响应
+
+        网络错误和可重试的状态码按端点的重试策略退避重试；POST请求带上幂等键，
+        重试时保持不变，服务端可据此去重。重试用尽后才计为熔断器的一次失败，
+        连续失败的请求过多时熔断，直接返回错误。
+        """
+        policy = self.get_retry_policy(endpoint_name)
+        headers = dict(headers or {})
+        if method == 'POST' and IDEMPOTENCY_HEADER not in headers:
+            headers[IDEMPOTENCY_HEADER] = uuid.uuid4().hex
+        plain_body = body
+        body = self._compress_request(endpoint_name, body, headers)
+
+        attempt = 0
+        while True:
+            attempt += 1
+            if not self.circuit_breaker.allow_request():
+                if attempt > 1:
+                    # 重试过程中熔断（或半开状态下探测请求需要重试），本次请求计为失败
+                    self.circuit_breaker.record_failure()
+                remaining = self.circuit_breaker.remaining()
+                print(f"后端服务熔断中，跳过请求: {url}")
+                return {"error": f"后端服务暂不可用（熔断中，约{remaining:.0f}秒后恢复）", "circuit_open": True}
+
+            retry_after = None
+            started = time.monotonic()
+            try:
+                status_code, reason, raw_headers, raw_data, truncated = self.pool.request(
+                    method, url, body=body, headers=headers, timeout=self.timeout, max_body=self.max_body
+                )
+            except Exception as e:
+                self.metrics.record(endpoint_name or url, type(e).__name__, time.monotonic() - started,
+                                    bytes_sent=len(body or b""), retry=attempt > 1, error=True)
+                print(f"请求发送失败: {e}")
+                result = {"error": f"请求失败: {str(e)}"}
+            else:
+                self.metrics.record(endpoint_name or url, status_code, time.monotonic() - started,
+                                    bytes_sent=len(body or b""), bytes_received=len(raw_data),
+                                    retry=attempt > 1, error=not 200 <= status_code < 300)
+                if status_code == 415 and "Content-Encoding" in headers:
+                    # 服务端不接受压缩请求体，该端点以后不再压缩
+                    print(f"服务端不支持压缩请求体，端点 {endpoint_name} 改为不压缩发送")
+                    self._uncompressed_endpoints.add(endpoint_name)
+                    headers.pop("Content-Encoding")
+                    body = plain_body
+                    attempt -= 1
+                    continue
+                if not policy.should_retry_status(status_code):
+                    self.circuit_breaker.record_success()
+                    return self._build_result(status_code, reason, raw_headers, raw_data, truncated)
+                retry_after = parse_retry_after(raw_headers.get("Retry-After"))
+                print(f"HTTP错误: {status_code} - {reason}")
+                result = {"error": f"HTTP错误: {status_code} - {reason}", "status_code": status_code}
+
+            if attempt >= policy.max_attempts:
+                self.circuit_breaker.record_failure()
+                return result
+            delay = policy.backoff(attempt, retry_after)
+            print(f"第 {attempt} 次请求失败，{delay:.1f}秒后重试...")
+            time.sleep(delay)
+
+    def _build_result(self, status_code, reason, raw_headers, raw_data, truncated=False):
+        """将原始响应整理为ApiResponse，出错时返回错误字典"""
+        # 连接池不会跟随重定向，非2xx状态码按错误处理
+        if status_code == 301 or status_code == 302:
+            print(f"禁止重定向: {status_code} - {raw_headers.get('Location')}")
+            print(f"检测到重定向（{status_code}），但我们不跟随重定向")
+            return {"error": f"服务器尝试重定向到HTTPS，但我们不允许重定向"}
+        if not 200 <= status_code < 300:
+            print(f"HTTP错误: {status_code} - {reason}")
+            return {"error": f"HTTP错误: {status_code} - {reason}", "status_code": status_code}
+
+        if raw_headers.get("Content-Encoding"):
+            try:
+                raw_data, cut = decompress_body(raw_data, raw_headers.get("Content-Encoding"), self.max_body)
+            except zlib.error as e:
+                print(f"响应解压失败: {e}")
+                return {"error": f"响应解压失败: {str(e)}"}
+            truncated = truncated or cut
+        if truncated:
+            print(f"响应体超过 {self.max_body} 字节，已截断")
+
+        return ApiResponse(status_code, raw_data, raw_headers, truncated)
+
     def get(self, endpoint_name, params=None, headers=None):
         """发送GET请求"""
         url = self.get_endpoint_url(endpoint_name)
@@ -102,63 +446,15 @@ class CurlHelper:
         if headers:
             request_headers.update(headers)
 
-        try:
-            # 使用纯urllib实现，不依赖requests库
-            import urllib.request
-            import urllib.error
-            import urllib.parse
-
-            # 添加查询参数
-            if params:
-                query_string = urllib.parse.urlencode(params)
-                if '?' in url:
-                    url += '&' + query_string
-                else:
-                    url += '?' + query_string
-
-            # 创建请求
-            req = urllib.request.Request(
-                url,
-                headers=request_headers,
-                method='GET'
-            )
-
-            # 禁止重定向
-            opener = urllib.request.build_opener(NoRedirectHandler())
-            urllib.request.install_opener(opener)
-
-            # 发送请求
-            try:
-                with urllib.request.urlopen(req, timeout=self.timeout) as response:
-                    response_data = response.read().decode('utf-8')
-                    status_code = response.status
-                    response_headers = dict(response.headers)
-
-                    # 解析响应
-                    try:
-                        json_response = json.loads(response_data)
-                        return {
-                            "status_code": status_code,
-                            "data": json_response,
-                            "headers": response_headers
-                        }
-                    except json.JSONDecodeError:
-                        return {
-                            "status_code": status_code,
-                            "text": response_data,
-                            "headers": response_headers
-                        }
-            except urllib.error.HTTPError as e:
-                if e.code == 301 or e.code == 302:
-                    print(f"检测到重定向（{e.code}），但我们不跟随重定向")
-                    return {"error": f"服务器尝试重定向到HTTPS，但我们不允许重定向"}
-                else:
-                    print(f"HTTP错误: {e.code} - {e.reason}")
-                    return {"error": f"HTTP错误: {e.code} - {e.reason}"}
+        # 添加查询参数
+        if params:
+            query_string = urllib.parse.urlencode(params)
+            if '?' in url:
+                url += '&' + query_string
+            else:
+                url += '?' + query_string
 
-        except Exception as e:
-            print(f"请求发送失败: {e}")
-            return {"error": f"请求失败: {str(e)}"}
+        return self._request('GET', url, headers=request_headers, endpoint_name=endpoint_name)
 
     def post(self, endpoint_name, data=None, json_data=None, headers=None):
         """发送POST请求"""
@@ -176,71 +472,27 @@ class CurlHelper:
         if headers:
             request_headers.update(headers)
 
-        try:
-            # 使用纯urllib实现，不依赖requests库
-            import urllib.request
-            import urllib.error
-
-            # 准备请求数据
-            if json_data:
-                post_data = json.dumps(json_data).encode('utf-8')
-                request_headers['Content-Type'] = 'application/json'
-            elif data:
-                post_data = data.encode('utf-8') if isinstance(data, str) else urllib.parse.urlencode(data).encode(
-                    'utf-8')
-                if 'Content-Type' not in request_headers:
-                    request_headers['Content-Type'] = 'application/x-www-form-urlencoded'
-            else:
-                post_data = None
+        # 准备请求数据
+        if json_data:
+            post_data = json.dumps(json_data).encode('utf-8')
+            request_headers['Content-Type'] = 'application/json'
+        elif data:
+            post_data = data.encode('utf-8') if isinstance(data, str) else urllib.parse.urlencode(data).encode(
+                'utf-8')
+            if 'Content-Type' not in request_headers:
+                request_headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        else:
+            post_data = None
 
-            # 创建请求
-            req = urllib.request.Request(
-                url,
-                data=post_data,
-                headers=request_headers,
-                method='POST'
-            )
+        return self._request('POST', url, body=post_data, headers=request_headers, endpoint_name=endpoint_name)
 
-            # 禁止重定向
-            opener = urllib.request.build_opener(NoRedirectHandler())
-            urllib.request.install_opener(opener)
+    def upload_cookies(self, account, cookies, account_id=None, timestamp=None, idempotency_key=None):
+        """
+        上传账号Cookie到API
 
-            # 发送请求
-            try:
-                with urllib.request.urlopen(req, timeout=self.timeout) as response:
-                    response_data = response.read().decode('utf-8')
-                    status_code = response.status
-                    response_headers = dict(response.headers)
-
-                    # 解析响应
-                    try:
-                        json_response = json.loads(response_data)
-                        return {
-                            "status_code": status_code,
-                            "data": json_response,
-                            "headers": response_headers
-                        }
-                    except json.JSONDecodeError:
-                        return {
-                            "status_code": status_code,
-                            "text": response_data,
-                            "headers": response_headers
-                        }
-            except urllib.error.HTTPError as e:
-                if e.code == 301 or e.code == 302:
-                    print(f"检测到重定向（{e.code}），但我们不跟随重定向")
-                    return {"error": f"服务器尝试重定向到HTTPS，但我们不允许重定向"}
-                else:
-                    print(f"HTTP错误: {e.code} - {e.reason}")
-                    return {"error": f"HTTP错误: {e.code} - {e.reason}"}
-
-        except Exception as e:
-            print(f"请求发送失败: {e}")
-            return {"error": f"请求失败: {str(e)}"}
-
-    def upload_cookies(self, account, cookies, account_id):
-        """上传账号Cookie到API"""
-        timestamp = time.time()
+        重发同一条记录时传入记录原来的timestamp和idempotency_key，服务端可据此去重。
+        """
+        timestamp = timestamp or time.time()
 
         # 获取完整的API端点URL
         url = self.get_endpoint_url("account")
@@ -255,78 +507,147 @@ class CurlHelper:
         }
         print(f"请求数据: {json.dumps(data, ensure_ascii=False)[:100]}...")  # 只打印前100个字符
 
-        # 直接使用urllib，完全绕过requests库
-        import urllib.request
-        import urllib.error
-
         # 确保URL是HTTP
         if url.startswith("https://"):
             url = "http://" + url[8:]
             print(f"已转换为HTTP URL: {url}")
 
-        try:
-            # 准备请求数据
-            post_data = json.dumps(data).encode('utf-8')
-            headers = self.default_headers.copy()
-            headers['Content-Type'] = 'application/json'
-
-            # 创建请求
-            req = urllib.request.Request(
-                url,
-                data=post_data,
-                headers=headers,
-                method='POST'
-            )
-
-            # 设置不允许重定向
-            opener = urllib.request.build_opener(NoRedirectHandler())
-            urllib.request.install_opener(opener)
-
-            # 发送请求
-            try:
-                with urllib.request.urlopen(req, timeout=self.timeout) as response:
-                    response_data = response.read().decode('utf-8')
-                    status_code = response.status
-                    response_headers = dict(response.headers)
-
-                    print(f"请求成功，状态码: {status_code}")
-
-                    # 解析响应
-                    try:
-                        json_response = json.loads(response_data)
-                        return {
-                            "status_code": status_code,
-                            "data": json_response,
-                            "headers": response_headers
-                        }
-                    except json.JSONDecodeError:
-                        return {
-                            "status_code": status_code,
-                            "text": response_data,
-                            "headers": response_headers
-                        }
-            except urllib.error.HTTPError as e:
-                if e.code == 301 or e.code == 302:
-                    print(f"检测到重定向（{e.code}），但我们不跟随重定向")
-                    return {"error": f"服务器尝试重定向到HTTPS，但我们不允许重定向"}
-                else:
-                    print(f"HTTP错误: {e.code} - {e.reason}")
-                    return {"error": f"HTTP错误: {e.code} - {e.reason}"}
-
-        except Exception as e:
-            print(f"请求发送失败: {e}")
-            return {"error": f"请求失败: {str(e)}"}
-
+        # 准备请求数据，不转义非ASCII字符以减小请求体
+        post_data = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+        headers = self.default_headers.copy()
+        headers['Content-Type'] = 'application/json'
+        if idempotency_key:
+            headers[IDEMPOTENCY_HEADER] = idempotency_key
+
+        result = self._request('POST', url, body=post_data, headers=headers, endpoint_name="account")
+        if "error" not in result:
+            print(f"请求成功，状态码: {result['status_code']}")
+        return result
+
+    def get_owner_info(self, cookies, phone=None, use_cache=True):
+        """
+        查询Cookie对应的OwnerInfo
+
+        成功的结果按Cookie指纹缓存，同一组Cookie命中缓存时不再请求info端点；
+        结果用于校验Cookie是否有效，不按手机号缓存。phone只用于日志。
+        返回 {"status_code", "data", "cached"}，失败时返回错误字典。
+        """
+        fingerprint_key = ("cookie", cookie_fingerprint(cookies))
+
+        if use_cache:
+            cached = self.owner_info_cache.get(fingerprint_key)
+            if cached is not None:
+                print(f"OwnerInfo命中缓存: {phone or fingerprint_key[1][:12]}")
+                return {"status_code": 200, "data": cached, "cached": True}
+
+        result = self.post("info", json_data={"cookies": cookies})
+        if "error" in result:
+            return result
+        data = result.get("data")
+        if data is None:
+            return {"error": f"info接口返回的不是JSON: {result.get('text', '')[:200]}"}
+
+        if isinstance(data, dict) and data.get("code") == 1:
+            self.owner_info_cache.set(fingerprint_key, data)
+        return {"status_code": result["status_code"], "data": data, "cached": False}
+
+    def _chunk_records(self, encoded):
+        """按记录数和字节数切分批次，返回下标列表的列表"""
+        max_records = max(1, self.batch_config.get("max_records", 50))
+        max_bytes = self.batch_config.get("max_bytes", 256 * 1024)
+
+        chunks = []
+        current = []
+        current_bytes = 2  # JSON数组的方括号
+        for index, item in enumerate(encoded):
+            # 记录之间需要一个逗号
+            item_bytes = len(item) + (1 if current else 0)
+            if current and (len(current) >= max_records or current_bytes + item_bytes > max_bytes):
+                chunks.append(current)
+                current = []
+                current_bytes = 2
+                item_bytes = len(item)
+            current.append(index)
+            current_bytes += item_bytes
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def upload_cookies_batch(self, records):
+        """
+        批量上传账号Cookie到API
+
+        records为 {account, cookies, account_id, timestamp, id} 字典的列表，id可选，
+        作为记录的幂等键。按记录数和字节数分批以JSON数组发送到account_batch端点，
+        未配置时发送到account端点；batch配置中per_record为true时改为逐条调用
+        upload_cookies。返回与records顺序一致的结果列表，每项格式与upload_cookies相同。
+        """
+        if not records:
+            return []
+
+        if self.batch_config.get("per_record", False):
+            return [self.upload_cookies(record.get("account"), record.get("cookies"), record.get("account_id"),
+                                        timestamp=record.get("timestamp"), idempotency_key=record.get("id"))
+                    for record in records]
+
+        url = self.get_endpoint_url("account_batch") or self.get_endpoint_url("account")
+        if not url:
+            return [{"error": "未找到端点: account"} for _ in records]
+        if url.startswith("https://"):
+            url = "http://" + url[8:]
+            print(f"已转换为HTTP URL: {url}")
 
-# 自定义处理程序，禁止重定向
-class NoRedirectHandler(urllib.request.HTTPRedirectHandler):
-    def http_error_302(self, req, fp, code, msg, headers):
-        print(f"禁止重定向: {code} - {headers.get('Location')}")
-        return None
+        now = time.time()
+        encoded = []
+        for record in records:
+            data = {
+                "account": record.get("account"),
+                "cookies": record.get("cookies"),
+                "account_id": record.get("account_id"),
+                "timestamp": record.get("timestamp") or now
+            }
+            if record.get("id"):
+                data["id"] = record["id"]
+            encoded.append(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode('utf-8'))
+
+        headers = self.default_headers.copy()
+        headers['Content-Type'] = 'application/json'
+
+        results = [None] * len(records)
+        chunks = self._chunk_records(encoded)
+        print(f"批量上传 {len(records)} 条记录，共 {len(chunks)} 个批次，发送到: {url}")
+        for number, chunk in enumerate(chunks, 1):
+            post_data = b"[" + b",".join(encoded[i] for i in chunk) + b"]"
+            chunk_headers = dict(headers)
+            ids = [records[i].get("id") for i in chunk]
+            if all(ids):
+                # 同一批记录重发时幂等键不变
+                chunk_headers[IDEMPOTENCY_HEADER] = hashlib.sha1(",".join(ids).encode("utf-8")).hexdigest()
+            result = self._request('POST', url, body=post_data, headers=chunk_headers, endpoint_name="account")
+            if "error" in result:
+                print(f"第 {number} 批上传失败: {result['error']}")
+            else:
+                print(f"第 {number} 批上传成功，{len(chunk)} 条记录，{len(post_data)} 字节")
+
+            # 服务端返回与请求等长的数组时按条拆分结果，否则整批共享同一结果
+            items = result.get("data")
+            if isinstance(items, dict) and isinstance(items.get("data"), list):
+                items = items["data"]
+            per_record = isinstance(items, list) and len(items) == len(chunk)
+            for offset, index in enumerate(chunk):
+                if per_record:
+                    item = items[offset]
+                    if isinstance(item, dict) and item.get("error"):
+                        results[index] = {"error": str(item["error"]), "status_code": result["status_code"]}
+                    else:
+                        results[index] = {"status_code": result["status_code"], "data": item}
+                else:
+                    results[index] = result
+        return results
 
-    http_error_301 = http_error_302
-    http_error_303 = http_error_302
-    http_error_307 = http_error_302
+    def close(self):
+        """关闭连接池中的所有连接"""
+        self.pool.close()
 
 
 # 测试代码
@@ -7,11 +7,18 @@ import os
 import json
 import time
 import platform
-from playwright.sync_api import sync_playwright
-from curl_helper import CurlHelper
 
-# 创建API客户端实例
-api_client = CurlHelper()
+# API客户端在首次使用时创建
+_api_client = None
+
+
+def get_api_client():
+    """获取API客户端实例，首次调用时创建"""
+    global _api_client
+    if _api_client is None:
+        from curl_helper import CurlHelper
+        _api_client = CurlHelper()
+    return _api_client
 
 def test_cookie(phone, url="https://niu.e.kuaishou.com/welcome"):
     """测试cookie获取和上传"""
@@ -31,6 +38,8 @@ def test_cookie(phone, url="https://niu.e.kuaishou.com/welcome"):
         print("请先在config.json中配置正确的chrome_path")
         return False
     
+    from playwright.sync_api import sync_playwright
+
     with sync_playwright() as p:
         # 使用配置的浏览器路径
         browser = p.chromium.launch(
@@ -72,7 +81,7 @@ def test_cookie(phone, url="https://niu.e.kuaishou.com/welcome"):
             
             # 测试上传到API
             print("测试上传cookie到API...")
-            result = api_client.upload_cookies(phone, cookie_string)
+            result = get_api_client().upload_cookies(phone, cookie_string)
             print(f"上传结果: {result}")
             
             return True
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+HTTP连接池 - 为API客户端提供长连接复用、连接数限制和DNS缓存
+"""
+
+import socket
+import threading
+import time
+import http.client
+from urllib.parse import urlsplit
+
+
+class DNSCache:
+    """带过期时间的DNS解析缓存"""
+
+    def __init__(self, ttl=300, on_resolve=None):
+        self.ttl = ttl
+        # 缓存未命中时的回调 on_resolve(主机, 耗时秒数, 异常)，用于统计DNS耗时
+        self.on_resolve = on_resolve
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def resolve(self, host, port):
+        """解析主机名，优先返回缓存结果"""
+        key = (host, port)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+
+        started = time.monotonic()
+        try:
+            addresses = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        except OSError as e:
+            if self.on_resolve:
+                self.on_resolve(host, time.monotonic() - started, e)
+            raise
+        if self.on_resolve:
+            self.on_resolve(host, time.monotonic() - started, None)
+        with self._lock:
+            self._entries[key] = (now + self.ttl, addresses)
+        return addresses
+
+    def invalidate(self, host, port):
+        """删除指定主机的缓存，下次连接时重新解析"""
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+    def create_connection(self, address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None):
+        """按缓存的解析结果建立TCP连接，签名与socket.create_connection一致"""
+        host, port = address
+        last_error = None
+        for family, socktype, proto, _, sockaddr in self.resolve(host, port):
+            sock = None
+            try:
+                sock = socket.socket(family, socktype, proto)
+                if timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+                    sock.settimeout(timeout)
+                if source_address:
+                    sock.bind(source_address)
+                sock.connect(sockaddr)
+                return sock
+            except OSError as e:
+                last_error = e
+                if sock is not None:
+                    sock.close()
+
+        # 所有地址都连接失败，缓存可能已过时
+        self.invalidate(host, port)
+        if last_error is not None:
+            raise last_error
+        raise OSError(f"无法解析主机: {host}")
+
+
+class PooledHTTPConnection(http.client.HTTPConnection):
+    """使用DNS缓存建立连接的HTTP连接"""
+
+    def __init__(self, host, port=None, dns_cache=None, **kwargs):
+        super().__init__(host, port, **kwargs)
+        if dns_cache is not None:
+            self._create_connection = dns_cache.create_connection
+
+
+class PooledHTTPSConnection(http.client.HTTPSConnection):
+    """使用DNS缓存建立连接的HTTPS连接"""
+
+    def __init__(self, host, port=None, dns_cache=None, **kwargs):
+        super().__init__(host, port, **kwargs)
+        if dns_cache is not None:
+            self._create_connection = dns_cache.create_connection
+
+
+class ConnectionPool:
+    """线程安全的长连接池，按 (协议, 主机, 端口) 分组管理连接"""
+
+    # 复用的空闲连接可能已被服务端关闭，遇到这些异常时用新连接重试一次
+    STALE_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                    ConnectionResetError, BrokenPipeError)
+
+    def __init__(self, maxsize=8, timeout=30, dns_ttl=300, idle_timeout=60):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.dns_cache = DNSCache(dns_ttl)
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._slots = {}
+        self._closed = False
+
+    def _slot(self, key):
+        """获取该主机的连接数信号量"""
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.maxsize)
+                self._slots[key] = slot
+            return slot
+
+    def _checkout(self, key):
+        """取出一个未过期的空闲连接，没有则返回None"""
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                conn, last_used = idle.pop()
+                if now - last_used < self.idle_timeout:
+                    return conn
+                conn.close()
+        return None
+
+    def _checkin(self, key, conn):
+        """将连接放回空闲列表"""
+        with self._lock:
+            if self._closed:
+                conn.close()
+                return
+            self._idle.setdefault(key, []).append((conn, time.monotonic()))
+
+    def _new_connection(self, scheme, host, port, timeout):
+        """新建连接"""
+        if scheme == "https":
+            return PooledHTTPSConnection(host, port, dns_cache=self.dns_cache, timeout=timeout)
+        return PooledHTTPConnection(host, port, dns_cache=self.dns_cache, timeout=timeout)
+
+    def request(self, method, url, body=None, headers=None, timeout=None, max_body=None):
+        """
+        发送请求并读取响应
+
+        返回 (状态码, 原因短语, 响应头, 响应体bytes, 是否截断)。不跟随重定向。
+        指定max_body时最多读取max_body字节，超出部分丢弃并关闭该连接；None或0不限制。
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        host = parts.hostname
+        port = parts.port or (443 if scheme == "https" else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        timeout = self.timeout if timeout is None else timeout
+        key = (scheme, host, port)
+
+        slot = self._slot(key)
+        slot.acquire()
+        try:
+            conn = self._checkout(key)
+            reused = conn is not None
+            while True:
+                if conn is None:
+                    conn = self._new_connection(scheme, host, port, timeout)
+                else:
+                    conn.timeout = timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                try:
+                    conn.request(method, path, body=body, headers=headers or {})
+                    response = conn.getresponse()
+                    data, truncated = self._read_body(response, max_body)
+                except self.STALE_ERRORS:
+                    conn.close()
+                    if not reused:
+                        raise
+                    conn, reused = None, False
+                    continue
+                except Exception:
+                    conn.close()
+                    raise
+
+                if response.will_close or truncated:
+                    conn.close()
+                else:
+                    self._checkin(key, conn)
+                return response.status, response.reason, response.headers, data, truncated
+        finally:
+            slot.release()
+
+    @staticmethod
+    def _read_body(response, max_body):
+        """读取响应体，超过max_body时截断，max_body为None或0时不限制"""
+        if not max_body:
+            return response.read(), False
+
+        chunks = []
+        remaining = max_body + 1
+        while remaining > 0:
+            chunk = response.read(min(remaining, 64 * 1024))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+
+        data = b"".join(chunks)
+        if len(data) > max_body:
+            return data[:max_body], True
+        # 读完chunked编码的结束块，连接才能复用
+        response.read()
+        return data, False
+
+    def close(self):
+        """关闭所有空闲连接"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn, _ in connections:
+                conn.close()
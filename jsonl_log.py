@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+追加写JSONL日志 - 发件箱和旧版已处理记录日志共用的读取与追加打开逻辑
+"""
+
+import json
+import os
+
+
+def read_entries(path):
+    """按顺序返回日志中的每条记录，文件不存在时不返回任何记录"""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # 崩溃时可能留下写了一半的最后一行，直接跳过
+                continue
+            if isinstance(entry, dict):
+                yield entry
+
+
+def open_for_append(path):
+    """
+    以追加方式打开日志
+
+    日志末尾是写了一半的行时先补一个换行，避免新记录接在残行后面。
+    """
+    f = open(path, "a", encoding="utf-8")
+    if os.path.getsize(path) > 0:
+        with open(path, "rb") as tail:
+            tail.seek(-1, os.SEEK_END)
+            torn = tail.read(1) != b"\n"
+        if torn:
+            f.write("\n")
+            f.flush()
+    return f
@@ -3,46 +3,114 @@
 快手账号管理工具 - 主程序
 """
 
+import time
+
+# 启动计时，用于检查启动耗时是否超出预算
+STARTUP_STARTED = time.perf_counter()
+
 import os
 import sys
 import json
-import time
 import platform
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
 import threading
 import queue
 import traceback
-import requests
-from playwright.sync_api import sync_playwright
-from curl_helper import CurlHelper
+from concurrent.futures import Future
+from account_list import VirtualAccountList
+from account_store import STATUS_LABELS
+
+
+# 启动耗时预算（毫秒），可通过环境变量调整
+STARTUP_BUDGET_MS = float(os.environ.get("KWAITOOL_STARTUP_BUDGET_MS", "800"))
+
+# API客户端和上传发件箱在首次使用时创建，不拖慢窗口显示
+_api_client = None
+_upload_outbox = None
+_engine_loop = None
+_account_store = None
+_services_lock = threading.Lock()
+
+
+def get_api_client():
+    """获取API客户端实例，首次调用时创建"""
+    global _api_client
+    with _services_lock:
+        if _api_client is None:
+            from curl_helper import CurlHelper
+            _api_client = CurlHelper(verbose=False)
+        return _api_client
+
+
+def get_upload_outbox():
+    """获取上传发件箱，Cookie先落盘再由后台线程上传"""
+    global _upload_outbox
+    api_client = get_api_client()
+    with _services_lock:
+        if _upload_outbox is None:
+            from upload_outbox import UploadOutbox
+            outbox_config = api_client.config.get("outbox", {})
+            batch_config = api_client.batch_config
+            # 逐条上传时每次只提交一条，停止时最多等待一条记录的重试
+            drain_batch = 1 if batch_config.get("per_record") else batch_config.get("max_records", 50)
+            _upload_outbox = UploadOutbox(
+                api_client,
+                path=outbox_config.get("path", "upload_outbox.jsonl"),
+                compact_threshold=outbox_config.get("compact_threshold", 100),
+                retry_delay=outbox_config.get("retry_delay", 5),
+                max_retry_delay=outbox_config.get("max_retry_delay", 300),
+                drain_batch=outbox_config.get("drain_batch", drain_batch)
+            )
+        return _upload_outbox
+
 
-# 创建API客户端实例
-api_client = CurlHelper()
+def get_account_store(log=print):
+    """获取账号库，首次调用时打开数据库并导入旧版账号文件"""
+    global _account_store
+    with _services_lock:
+        if _account_store is None:
+            from account_store import AccountStore
+            _account_store = AccountStore(ACCOUNTS_DB)
+            _account_store.migrate_legacy(ACCOUNTS_DIR, PROCESSED_FILE, log)
+        return _account_store
+
+
+def get_engine_loop():
+    """获取运行账号处理引擎的后台事件循环"""
+    global _engine_loop
+    with _services_lock:
+        if _engine_loop is None:
+            from account_engine import EventLoopThread
+            _engine_loop = EventLoopThread().start()
+        return _engine_loop
 
 # 全局变量
+ACCOUNTS_DB = "accounts.db"
+# 旧版数据，首次打开账号库时导入
 ACCOUNTS_DIR = "accounts"
 PROCESSED_FILE = "processed_accounts.json"
 running = False
 stop_event = threading.Event()
 log_queue = queue.Queue()
+# 处理引擎发出的账号事件，界面线程定期合并处理
+account_events = queue.Queue()
 
-# 确保必要的目录存在
-if not os.path.exists(ACCOUNTS_DIR):
-    os.makedirs(ACCOUNTS_DIR)
 
-# 加载已处理的账号
-processed_accounts = {}
-if os.path.exists(PROCESSED_FILE):
+def load_browser_config(log=print):
+    """读取config.json中的浏览器配置"""
+    if not os.path.exists("config.json"):
+        return {}
     try:
-        with open(PROCESSED_FILE, "r", encoding="utf-8") as f:
-            processed_accounts = json.load(f)
+        with open("config.json", "r", encoding="utf-8") as f:
+            return json.load(f)
     except Exception as e:
-        print(f"加载已处理账号失败: {e}")
+        log(f"加载浏览器配置失败: {e}")
+        return {}
 
 
 class KwaiTool:
-    def __init__(self, root):
+    def __init__(self, root, background_services=True):
         self.root = root
         self.root.title("快手账号管理工具")
         self.root.geometry("800x600")
@@ -62,7 +130,9 @@ class KwaiTool:
         self.create_toolbar()
 
         # 创建主界面
+        self.processing_accounts = set()
         self.create_main_ui()
+        self.root.after(200, self.poll_account_events)
 
         # 创建状态栏
         self.create_statusbar()
@@ -74,13 +144,39 @@ class KwaiTool:
         self.log_update_thread = threading.Thread(target=self.update_log, daemon=True)
         self.log_update_thread.start()
 
+        # 窗口显示后再记录启动耗时并启动后台服务
+        if background_services:
+            self.root.after_idle(self.on_started)
+
         # 显示欢迎信息
         self.log("快手账号管理工具已启动")
         self.log(f"当前系统: {platform.system()} {platform.version()}")
         self.log(f"Python版本: {platform.python_version()}")
-        self.log(f"账号目录: {os.path.abspath(ACCOUNTS_DIR)}")
+        self.log(f"账号库: {os.path.abspath(ACCOUNTS_DB)}")
         self.update_status("就绪")
 
+    def on_started(self):
+        """窗口显示后的处理"""
+        elapsed_ms = startup_elapsed_ms()
+        self.log(f"启动耗时: {elapsed_ms:.0f}ms")
+        if elapsed_ms > STARTUP_BUDGET_MS:
+            self.log(f"启动耗时超出预算 {STARTUP_BUDGET_MS:.0f}ms")
+
+        threading.Thread(target=self.start_background_services, daemon=True).start()
+
+    def start_background_services(self):
+        """在后台线程中创建API客户端并启动发件箱上传"""
+        try:
+            api_client = get_api_client()
+            self.log(f"API地址: {api_client.base_url}，端点: {list(api_client.endpoints.keys())}")
+            upload_outbox = get_upload_outbox()
+            upload_outbox.log = self.log
+            upload_outbox.on_dead = self.on_upload_rejected
+            upload_outbox.start()
+        except Exception as e:
+            self.log(f"启动后台服务失败: {e}")
+            traceback.print_exc()
+
     def create_menu(self):
         """创建菜单栏"""
         menubar = tk.Menu(self.root)
@@ -137,28 +233,20 @@ class KwaiTool:
         paned.add(accounts_frame, weight=1)
 
         # 创建账号列表
+        # 只显示可见的行，数据和选中状态保存在self.account_list.model中
         columns = ("账号", "密码", "状态", "更新时间")
-        self.accounts_tree = ttk.Treeview(accounts_frame, columns=columns, show="headings")
-
-        # 设置列标题
-        for col in columns:
-            self.accounts_tree.heading(col, text=col)
-            self.accounts_tree.column(col, width=100)
-
-        # 添加滚动条
-        accounts_scrollbar = ttk.Scrollbar(accounts_frame, orient=tk.VERTICAL, command=self.accounts_tree.yview)
-        self.accounts_tree.configure(yscrollcommand=accounts_scrollbar.set)
+        self.account_list = VirtualAccountList(accounts_frame, columns)
 
         # 创建右键菜单
-        self.context_menu = tk.Menu(self.accounts_tree, tearoff=0)
+        self.context_menu = tk.Menu(self.account_list.tree, tearoff=0)
+        self.context_menu.add_command(label="处理选中账号", command=self.process_selected)
         self.context_menu.add_command(label="删除账号", command=self.remove_account)
 
         # 绑定右键点击事件
-        self.accounts_tree.bind("<Button-3>", self.show_context_menu)
+        self.account_list.tree.bind("<Button-3>", self.show_context_menu)
 
         # 布局
-        accounts_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.accounts_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.account_list.pack(fill=tk.BOTH, expand=True)
 
         # 下部分：日志区域
         log_frame = ttk.LabelFrame(paned, text="日志")
@@ -204,88 +292,163 @@ class KwaiTool:
             except Exception as e:
                 print(f"日志更新线程异常: {e}")
 
-    def load_accounts(self):
-        """加载账号列表"""
-        # 清空现有列表
-        for item in self.accounts_tree.get_children():
-            self.accounts_tree.delete(item)
+    def account_values(self, row):
+        """账号在列表中显示的内容"""
+        if row["phone"] in self.processing_accounts:
+            status = "处理中"
+        else:
+            status = STATUS_LABELS.get(row["status"], row["status"])
+        return row["phone"], row["password"], status, row["processed_at"] or ""
 
-        # 扫描账号目录
-        if not os.path.exists(ACCOUNTS_DIR):
-            os.makedirs(ACCOUNTS_DIR)
-            self.log(f"创建账号目录: {ACCOUNTS_DIR}")
-            return
+    def refresh_accounts(self, phones=None):
+        """
+        刷新账号列表
 
+        与列表模型中的内容比较，只修改有变化的账号，有变化时重新填充可见的行。
+        phones为None时刷新全部账号，否则只刷新指定的手机号。
+        """
         try:
-            account_files = [f for f in os.listdir(ACCOUNTS_DIR) if f.endswith(".txt")]
+            store = get_account_store(self.log)
+            model = self.account_list.model
+            if phones is None:
+                rows = store.list_accounts()
+                stale = set(model.phones) - {row["phone"] for row in rows}
+            else:
+                rows = store.get_many(phones)
+                stale = set(phones) - {row["phone"] for row in rows}
 
-            for file in account_files:
-                try:
-                    with open(os.path.join(ACCOUNTS_DIR, file), "r", encoding="utf-8") as f:
-                        lines = f.readlines()
-                        if lines:
-                            username = lines[0].strip()
-
-                            # 检查是否已处理
-                            status = "未处理"
-                            update_time = ""
-                            if username in processed_accounts:
-                                status = "已处理"
-                                update_time = processed_accounts[username].get("time", "")
-
-                            self.accounts_tree.insert("", tk.END, values=(username, "", status, update_time))
-                except Exception as e:
-                    self.log(f"加载账号文件 {file} 失败: {e}")
-
-            self.log(f"已加载 {len(account_files)} 个账号文件")
+            changed = model.remove_many(stale)
+            for row in rows:
+                changed = model.update(row["phone"], self.account_values(row)) or changed
+            if changed:
+                self.account_list.render()
+
+            if phones is None:
+                self.log(f"已加载 {len(rows)} 个账号")
         except Exception as e:
             self.log(f"加载账号列表失败: {e}")
 
+    def account_event(self, username, event):
+        """处理引擎的账号事件（started、finished），可在任意线程调用，started会写账号库"""
+        if event == "started":
+            get_account_store(self.log).reset_upload_failed(username)
+        account_events.put((username, event))
+
+    def on_upload_rejected(self, record, error):
+        """发件箱中的记录被服务器拒绝，在发件箱线程中调用，账号改为上传失败以便重新处理"""
+        get_account_store(self.log).mark_upload_failed(record["account"])
+        account_events.put((record["account"], "upload_failed"))
+
+    def poll_account_events(self):
+        """在界面线程中合并处理账号事件，只刷新有变化的账号"""
+        changed = set()
+        while True:
+            try:
+                username, event = account_events.get_nowait()
+            except queue.Empty:
+                break
+            if event == "started":
+                self.processing_accounts.add(username)
+            elif event == "finished":
+                self.processing_accounts.discard(username)
+            changed.add(username)
+        if changed:
+            self.refresh_accounts(changed)
+        self.root.after(200, self.poll_account_events)
+
     def import_accounts(self):
-        """导入账号"""
+        """导入账号，在后台线程中逐行读取并分批写入账号库，可随时取消"""
         file_path = filedialog.askopenfilename(
             title="选择账号文件",
-            filetypes=[("文本文件", "*.txt"), ("所有文件", "*.*")]
+            filetypes=[
+                ("账号文件", "*.txt *.csv *.jsonl"),
+                ("文本文件", "*.txt"),
+                ("CSV文件", "*.csv"),
+                ("JSONL文件", "*.jsonl"),
+                ("所有文件", "*.*")
+            ]
         )
 
         if not file_path:
             return
 
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-
-                # 每行一个账号
-                accounts = [line.strip() for line in lines if line.strip()]
-                imported = 0
-
-                for account in accounts:
-                    # 创建账号文件
-                    account_file = os.path.join(ACCOUNTS_DIR, f"{account}.txt")
-                    with open(account_file, "w", encoding="utf-8") as af:
-                        af.write(account)
-                    imported += 1
-
-                self.log(f"成功导入 {imported} 个账号")
-                self.load_accounts()
+            from account_importer import AccountImporter
+
+            importer = AccountImporter(get_account_store(self.log))
         except Exception as e:
             self.log(f"导入账号失败: {e}")
             messagebox.showerror("错误", f"导入账号失败: {e}")
+            return
+
+        cancel_event = threading.Event()
+        result = {}
+
+        # 进度对话框
+        progress_dialog = tk.Toplevel(self.root)
+        progress_dialog.title("导入账号")
+        progress_dialog.geometry("400x150")
+        progress_dialog.grab_set()
+        ttk.Label(progress_dialog, text=f"正在导入 {os.path.basename(file_path)}").pack(pady=(15, 5))
+        progress_bar = ttk.Progressbar(progress_dialog, mode="determinate", length=340)
+        progress_bar.pack(padx=20, pady=5)
+        detail_label = ttk.Label(progress_dialog, text="")
+        detail_label.pack(pady=5)
+
+        def on_cancel():
+            cancel_event.set()
+            cancel_button.config(state=tk.DISABLED)
+            detail_label.config(text="正在取消...")
+
+        cancel_button = ttk.Button(progress_dialog, text="取消", command=on_cancel)
+        cancel_button.pack(pady=5)
+        progress_dialog.protocol("WM_DELETE_WINDOW", on_cancel)
+
+        def run_import():
+            try:
+                result["stats"] = importer.run(file_path, cancel_event)
+            except Exception as e:
+                result["error"] = e
+
+        import_thread = threading.Thread(target=run_import, daemon=True)
+        import_thread.start()
+        self.update_status("正在导入账号...")
+
+        def poll_progress():
+            stats = importer.stats
+            if importer.total_bytes:
+                progress_bar["value"] = importer.bytes_read * 100 / importer.total_bytes
+            if not cancel_event.is_set():
+                detail_label.config(text=f"已读取 {stats['read']} 行，新增 {stats['imported']} 个账号")
+            if import_thread.is_alive():
+                progress_dialog.after(100, poll_progress)
+                return
+
+            progress_dialog.destroy()
+            self.update_status("就绪")
+            if "error" in result:
+                self.log(f"导入账号失败: {result['error']}")
+                messagebox.showerror("错误", f"导入账号失败: {result['error']}")
+            else:
+                prefix = "导入已取消，已" if stats["cancelled"] else "成功"
+                self.log(f"{prefix}导入 {stats['imported']} 个账号，跳过 {stats['skipped']} 个已存在或重复的账号，"
+                         f"{stats['invalid']} 行无法解析")
+            self.refresh_accounts()
+
+        poll_progress()
 
-    def start_processing(self):
-        """开始处理账号"""
+    def start_processing(self, phones=None):
+        """开始处理账号，phones不为None时只处理其中的账号"""
         global running
 
         if running:
             messagebox.showinfo("提示", "已有处理任务正在运行")
             return
 
-        # 获取未处理的账号
-        accounts_to_process = []
-        for item in self.accounts_tree.get_children():
-            values = self.accounts_tree.item(item, "values")
-            if values[2] != "已处理":
-                accounts_to_process.append((values[0], values[1]))
+        # 按账号库中的状态获取未处理的账号，phones为列表模型中选中的手机号
+        accounts_to_process = get_account_store(self.log).pending_accounts()
+        if phones is not None:
+            accounts_to_process = [account for account in accounts_to_process if account[0] in phones]
 
         if not accounts_to_process:
             messagebox.showinfo("提示", "没有需要处理的账号")
@@ -304,49 +467,39 @@ class KwaiTool:
         )
         processing_thread.start()
 
+    def process_selected(self):
+        """处理列表中选中的账号"""
+        selected = self.account_list.selection()
+        if not selected:
+            messagebox.showinfo("提示", "请先选择要处理的账号")
+            return
+        self.start_processing(set(selected))
+
+    def mark_processed(self, username):
+        """记录账号已处理，在处理引擎的线程池中调用"""
+        get_account_store(self.log).mark_processed(username)
+
     def process_accounts(self, accounts):
-        """处理账号的线程函数"""
+        """处理账号的线程函数，在处理引擎的事件循环中运行并等待结果"""
         global running
 
         try:
-            total_accounts = len(accounts)
-            self.log(f"开始处理 {total_accounts} 个账号")
-            self.update_status(f"处理中... (0/{total_accounts})")
-
-            for i, (username, _) in enumerate(accounts):
-                if stop_event.is_set():
-                    self.log("处理已停止")
-                    break
-
-                # 更新状态栏
-                self.update_status(f"处理中... ({i + 1}/{total_accounts})")
-                self.log(f"正在处理账号 ({i + 1}/{total_accounts}): {username}")
-
-                try:
-                    # 使用Playwright处理账号
-                    result = self.process_account(username)
-
-                    if result:
-                        # 更新已处理记录
-                        processed_accounts[username] = {
-                            "time": time.strftime("%Y-%m-%d %H:%M:%S")
-                        }
-
-                        # 保存已处理记录
-                        with open(PROCESSED_FILE, "w", encoding="utf-8") as f:
-                            json.dump(processed_accounts, f, indent=2, ensure_ascii=False)
+            browser_config = load_browser_config(self.log)
+            browser_path = browser_config.get("chrome_path")
+            if not browser_path or not os.path.exists(browser_path):
+                messagebox.showwarning("警告", "请先在设置中配置正确的浏览器路径")
+                return
 
-                        self.log(f"账号 {username} 处理成功")
-                    else:
-                        self.log(f"账号 {username} 处理失败")
+            from account_engine import AccountEngine
 
-                except Exception as e:
-                    self.log(f"处理账号 {username} 时出错: {e}")
-                    traceback.print_exc()
+            engine = AccountEngine(browser_config, self, get_api_client, stop_event)
+            progress = get_engine_loop().submit(engine.run(accounts)).result()
 
-            self.log("账号处理完成")
+            if stop_event.is_set():
+                self.log("处理已停止")
+            self.log(f"账号处理完成，成功 {progress['succeeded']} 个，失败 {progress['finished'] - progress['succeeded']} 个")
             self.update_status("处理完成")
-            messagebox.showinfo("处理完成", f"所有账号处理完成！\n共处理 {total_accounts} 个账号")
+            messagebox.showinfo("处理完成", f"所有账号处理完成！\n共处理 {progress['finished']} 个账号")
         except Exception as e:
             self.log(f"处理过程出错: {e}")
             traceback.print_exc()
@@ -354,279 +507,137 @@ class KwaiTool:
             running = False
             self.update_status("就绪")
 
+            # 保存并输出接口统计
+            try:
+                for endpoint, stats in get_api_client().dump_metrics().items():
+                    latency = stats["latency_ms"]
+                    self.log(f"接口统计 {endpoint}: 请求 {stats['requests']} 次，失败 {stats['errors']} 次，"
+                             f"p50 {latency['p50']}ms，p95 {latency['p95']}ms，p99 {latency['p99']}ms")
+            except Exception as e:
+                self.log(f"保存接口统计失败: {e}")
+
             # 刷新账号列表
-            self.root.after(0, self.load_accounts)
+            self.root.after(0, self.refresh_accounts)
+
+    def open_dialog(self, show_dialog, *args):
+        """
+        在界面线程中显示对话框，可在任意线程调用
 
-    def process_account(self, username):
-        """严格按照指定流程处理单个账号"""
+        show_dialog(future, *args)在界面线程中执行，用户操作后通过返回的future给出结果。
+        """
+        future = Future()
+        self.root.after(0, lambda: show_dialog(future, *args))
+        return future
+
+    def show_code_dialog(self, future, username):
+        """验证码输入对话框，取消时返回None"""
+        code_dialog = tk.Toplevel(self.root)
+        code_dialog.title("输入验证码")
+        code_dialog.geometry("300x150")
+        code_dialog.grab_set()
+        ttk.Label(code_dialog, text=f"请输入账号 {username} 收到的验证码:").pack(pady=(20, 10))
+        code_var = tk.StringVar()
+        code_entry = ttk.Entry(code_dialog, textvariable=code_var, width=10, justify="center")
+        code_entry.pack(pady=(0, 20))
+        code_entry.focus()
+
+        def on_submit():
+            code = code_var.get().strip()
+            if len(code) != 6 or not code.isdigit():
+                messagebox.showwarning("警告", "请输入6位数字验证码")
+                return
+            future.set_result(code)
+            code_dialog.destroy()
+
+        def on_cancel():
+            future.set_result(None)
+            code_dialog.destroy()
+
+        submit_button = ttk.Button(code_dialog, text="确定", command=on_submit)
+        submit_button.pack()
+        code_dialog.bind("<Return>", lambda event: on_submit())
+        code_dialog.protocol("WM_DELETE_WINDOW", on_cancel)
+
+    def show_account_dialog(self, future, account_infos, username=None):
+        """选择登录账号对话框，返回所选accountId列表（可多选），取消时返回None"""
+        select_dialog = tk.Toplevel(self.root)
+        select_dialog.title("选择登录账号")
+        select_dialog.geometry("400x340")
+        select_dialog.grab_set()
+        ttk.Label(select_dialog, text="请选择要登录的账号（按住Ctrl或Shift可多选）:").pack(pady=(20, 10))
+        account_frame = ttk.Frame(select_dialog)
+        account_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        account_listbox = tk.Listbox(account_frame, width=50, height=10, selectmode=tk.EXTENDED)
+        account_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar = ttk.Scrollbar(account_frame, orient="vertical", command=account_listbox.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        account_listbox.config(yscrollcommand=scrollbar.set)
+        account_map = {}
+        for account in account_infos:
+            account_name = account.get('accountName', '未命名账号')
+            account_id = account.get('accountId', 0)
+            account_type = account.get('accountTypeDescription', '')
+            display_text = f"{account_name} ({account_type})({account_id})"
+            account_listbox.insert(tk.END, display_text)
+            account_map[display_text] = account_id
+        # 导入时指定了accountId的账号预先选中该账户
         try:
-            # 读取浏览器配置
-            browser_path = None
-            if os.path.exists("config.json"):
-                try:
-                    with open("config.json", "r", encoding="utf-8") as f:
-                        config_data = json.load(f)
-                        browser_path = config_data.get("chrome_path")
-                except Exception as e:
-                    self.log(f"加载浏览器配置失败: {e}")
+            record = get_account_store(self.log).get(username) if username else None
+        except Exception:
+            record = None
+        preselected = record["account_id"] if record is not None else None
+        preselected_indices = [i for i, account in enumerate(account_infos)
+                               if preselected and str(account.get('accountId', 0)) == preselected]
+        for index in preselected_indices or [0]:
+            if index < account_listbox.size():
+                account_listbox.select_set(index)
+                account_listbox.see(index)
+
+        def on_select(event=None):
+            selected_indices = account_listbox.curselection()
+            if not selected_indices:
+                messagebox.showwarning("警告", "请选择一个账号")
+                return
+            selected_ids = [account_map.get(account_listbox.get(index)) for index in selected_indices]
+            if all(selected_ids):
+                future.set_result(selected_ids)
+                select_dialog.destroy()
+            else:
+                messagebox.showwarning("警告", "无法获取所选账号ID")
 
-            if not browser_path or not os.path.exists(browser_path):
-                messagebox.showwarning("警告", "请先在设置中配置正确的浏览器路径")
-                return False
-
-            with sync_playwright() as p:
-                browser = p.chromium.launch(
-                    headless=False,
-                    executable_path=browser_path
-                )
-                context = browser.new_context()
-                page = context.new_page()
-                result = False
-                try:
-                    # 1. 打开快手牛平台
-                    page.goto("https://niu.e.kuaishou.com/welcome")
-                    self.log("已打开快手牛平台")
-                    page.wait_for_load_state("networkidle")
-
-                    # 2. 检测并点击"立即登录"按钮
-                    self.log("检测是否存在'立即登录'按钮...")
-                    login_button = None
-                    try:
-                        login_button = page.wait_for_selector("button:has-text('立即登录')", timeout=5000)
-                    except:
-                        pass
-                    if not login_button:
-                        try:
-                            login_button_span = page.wait_for_selector("button.ant-btn span:has-text('立即登录')", timeout=5000)
-                            if login_button_span:
-                                login_button = page.evaluate("el => el.closest('button')", login_button_span)
-                        except:
-                            pass
-                    if not login_button:
-                        try:
-                            login_button = page.wait_for_selector("//button[contains(@class, 'ant-btn')][.//span[text()='立即登录']]", timeout=5000)
-                        except:
-                            pass
-                    if not login_button:
-                        self.log("未找到'立即登录'按钮")
-                        return False
-                    self.log("找到'立即登录'按钮，点击中...")
-                    login_button.click()
-                    self.log("已点击'立即登录'按钮")
-                    page.wait_for_timeout(2000)
-
-                    # 3. 切换到验证码登录
-                    self.log("查找'验证码登录'选项卡...")
-                    try:
-                        code_login_tab = page.wait_for_selector("div.tab.svelte-rlva34:has-text('验证码登录')", timeout=5000)
-                        if code_login_tab:
-                            self.log("找到'验证码登录'选项卡，点击中...")
-                            code_login_tab.click()
-                            self.log("已切换到验证码登录模式")
-                        else:
-                            self.log("未找到'验证码登录'选项卡")
-                            return False
-                    except Exception as e:
-                        self.log(f"查找验证码登录选项卡出错: {e}")
-                        return False
-
-                    # 4. 输入手机号
-                    self.log(f"正在输入手机号: {username}")
-                    phone_input = page.wait_for_selector("input.component-input-real-value[placeholder='手机号']", timeout=5000)
-                    phone_input.fill(username)
-                    self.log(f"已输入手机号: {username}")
-
-                    # 5. 发送验证码
-                    send_code_button = page.wait_for_selector("span.svelte-9i4e5y:has-text('发送手机验证码')", timeout=5000)
-                    send_code_button.click()
-                    self.log("已点击发送验证码按钮")
-                    self.log("等待用户输入验证码...")
-
-                    # 6. 弹窗输入验证码
-                    code_dialog = tk.Toplevel(self.root)
-                    code_dialog.title("输入验证码")
-                    code_dialog.geometry("300x150")
-                    code_dialog.grab_set()
-                    ttk.Label(code_dialog, text=f"请输入账号 {username} 收到的验证码:").pack(pady=(20, 10))
-                    code_var = tk.StringVar()
-                    code_entry = ttk.Entry(code_dialog, textvariable=code_var, width=10, justify="center")
-                    code_entry.pack(pady=(0, 20))
-                    code_entry.focus()
-                    code_result = [None]
-                    def on_submit():
-                        code = code_var.get().strip()
-                        if len(code) != 6 or not code.isdigit():
-                            messagebox.showwarning("警告", "请输入6位数字验证码")
-                            return
-                        code_result[0] = code
-                        code_dialog.destroy()
-                    submit_button = ttk.Button(code_dialog, text="确定", command=on_submit)
-                    submit_button.pack()
-                    code_dialog.bind("<Return>", lambda event: on_submit())
-                    self.root.wait_window(code_dialog)
-                    verification_code = code_result[0]
-                    if not verification_code:
-                        self.log("未获取到验证码，取消登录")
-                        return False
-                    self.log(f"获取到验证码: {verification_code}")
-
-                    # 7. 输入验证码并登录
-                    code_input = page.wait_for_selector("input.component-input-real-value[placeholder='请输入验证码']", timeout=5000)
-                    code_input.fill(verification_code)
-                    checkbox = page.wait_for_selector("input.component-checkbox-input.svelte-1x8ouvx", timeout=5000)
-                    if not checkbox.is_checked():
-                        checkbox.check()
-                        self.log("已勾选同意条款复选框")
-                    submit_button = page.wait_for_selector("button.component-button.submit.component-button-primary", timeout=5000)
-                    submit_button.click()
-                    self.log("已点击登录按钮")
-                    self.log("等待登录完成...")
-
-                    # 登录成功，获取cookie
-                    self.log("登录弹窗已消失，登录成功！")
-                    self.log("等待页面跳转和cookie下发...")
-                    page.wait_for_timeout(3000)  # 等待3秒
-                    # 再获取cookie
-                    cookies = context.cookies()
-                    if not cookies:
-                        self.log("无法获取Cookie，登录可能失败")
-                        return False
-                    cookie_string = "; ".join([f"{c['name']}={c['value']}" for c in cookies])
-                    self.log(f"登录后获取到的Cookie: {cookie_string}")
-
-                    # 调试：打印 CurlHelper 加载到的 endpoints
-                    self.log(f"当前 CurlHelper endpoints: {api_client.endpoints}")
-                    if "info" not in api_client.endpoints:
-                        self.log("endpoints 中未找到 'info' key，请检查 curl_config.json 配置！")
-                    else:
-                        self.log(f"endpoints['info']: {api_client.endpoints['info']}")
-                    info_url = api_client.get_endpoint_url("info")
-                    body = {
-                        "cookies": cookie_string
-                    }
-                    self.log(f"实际请求的 info_url: {info_url}")
-                    try:
-                        resp = requests.post(info_url, json=body)
-                        self.log(f"info接口响应状态码: {resp.status_code}")
-                        self.log(f"info接口响应内容: {resp.text}")
-                        resp_json = resp.json()
-                    except Exception as e:
-                        self.log(f"请求或解析 info 响应出错: {e}")
-                        return False
-                    if resp_json.get("code") != 1:
-                        self.log(f"info接口返回失败: {resp_json}")
-                        return False
-                    data = resp_json.get("data", {})
-                    account_infos = data.get('accountInfos', [])
-                    if not isinstance(account_infos, list):
-                        account_infos = []
-                    self.log(f"accountInfos长度: {len(account_infos)}")
-                    self.log(f"accountInfos内容: {account_infos}")
-                    if len(account_infos) == 0:
-                        self.log("检测到单一账号，直接上传cookie")
-                        self.send_account_info(username, cookie_string)
-                        result = True
-                    else:
-                        self.log(f"检测到多个账号，数量: {len(account_infos)}，等待用户选择登录账户")
-                        select_dialog = tk.Toplevel(self.root)
-                        select_dialog.title("选择登录账号")
-                        select_dialog.geometry("400x300")
-                        select_dialog.grab_set()
-                        ttk.Label(select_dialog, text="请选择要登录的账号:").pack(pady=(20, 10))
-                        account_frame = ttk.Frame(select_dialog)
-                        account_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
-                        account_listbox = tk.Listbox(account_frame, width=50, height=10)
-                        account_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-                        scrollbar = ttk.Scrollbar(account_frame, orient="vertical", command=account_listbox.yview)
-                        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-                        account_listbox.config(yscrollcommand=scrollbar.set)
-                        account_map = {}
-                        for account in account_infos:
-                            account_name = account.get('accountName', '未命名账号')
-                            account_id = account.get('accountId', 0)
-                            account_type = account.get('accountTypeDescription', '')
-                            display_text = f"{account_name} ({account_type})({account_id})"
-                            account_listbox.insert(tk.END, display_text)
-                            account_map[display_text] = account_id
-                        if account_listbox.size() > 0:
-                            account_listbox.select_set(0)
-                        selected_result = [None]
-                        def on_select(event=None):
-                            selected_indices = account_listbox.curselection()
-                            if not selected_indices:
-                                messagebox.showwarning("警告", "请选择一个账号")
-                                return
-                            selected_item = account_listbox.get(selected_indices[0])
-                            selected_id = account_map.get(selected_item)
-                            if selected_id:
-                                selected_result[0] = selected_id
-                                select_dialog.destroy()
-                            else:
-                                messagebox.showwarning("警告", "无法获取所选账号ID")
-                        ttk.Button(select_dialog, text="确定", command=on_select).pack(pady=10)
-                        account_listbox.bind('<Double-1>', on_select)
-                        self.root.wait_window(select_dialog)
-                        if not selected_result[0]:
-                            self.log("用户未选择账号，处理中止")
-                            return False
-                        selected_account_id = selected_result[0]
-                        self.log(f"用户选择了账号ID: {selected_account_id}")
-                        # 6. 跳转至对应账户页
-                        account_url = f"https://niu.e.kuaishou.com/home?__accountId__={selected_account_id}&homeType=new"
-                        self.log(f"跳转至对应账户页: {account_url}")
-                        page.goto(account_url, wait_until="networkidle")
-                        page.wait_for_timeout(2000)
-                        # 7. 获取新页面cookie
-                        cookies = context.cookies()
-                        if not cookies:
-                            self.log("跳转后未获取到Cookie")
-                            return False
-                        new_cookie_string = "; ".join([f"{c['name']}={c['value']}" for c in cookies])
-                        self.log(f"跳转后获取新页面Cookie: {new_cookie_string}")
-                        # 8. 上传服务器(cookie+account_id+account)
-                        self.send_account_info(username, new_cookie_string, selected_account_id)
-                        result = True
-                finally:
-                    try:
-                        browser.close()
-                        self.log("浏览器已关闭")
-                    except Exception as e:
-                        self.log(f"关闭浏览器时出错: {e}")
-                return result
-        except Exception as e:
-            self.log(f"处理过程出错: {e}")
-            traceback.print_exc()
-            return False
+        def on_select_all():
+            account_listbox.select_set(0, tk.END)
+
+        def on_cancel():
+            future.set_result(None)
+            select_dialog.destroy()
+
+        button_frame = ttk.Frame(select_dialog)
+        button_frame.pack(pady=10)
+        ttk.Button(button_frame, text="全选", command=on_select_all).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="确定", command=on_select).pack(side=tk.LEFT, padx=5)
+        account_listbox.bind('<Double-1>', on_select)
+        select_dialog.protocol("WM_DELETE_WINDOW", on_cancel)
 
     def send_account_info(self, phone, cookie, account_id=None):
         """发送账号信息到API"""
         try:
-            # 准备要发送的数据
-            data = {
-                "phone": phone,
-                "cookie": cookie,
-                "timestamp": time.strftime('%Y-%m-%d %H:%M:%S')
-            }
-
             # 如果有account_id，添加到数据中
             if account_id:
-                data["account_id"] = account_id
                 self.log(f"将同时上传account_id: {account_id}")
 
             # 获取并打印API端点地址
-            endpoint_url = api_client.get_endpoint_url("account")
+            endpoint_url = get_api_client().get_endpoint_url("account")
             self.log(f"正在发送数据到API地址: {endpoint_url}")
 
-            # 调用API发送数据
-            result = api_client.upload_cookies(phone, cookie, account_id)
+            # 先写入发件箱，由后台线程上传，失败时自动重试
+            get_upload_outbox().put(phone, cookie, account_id)
 
-            if result and "error" not in result:
-                self.log(f"账号 {phone} 的信息已成功发送到服务器")
-                return True
-            else:
-                error_msg = result.get("error", "未知错误") if result else "请求失败"
-                self.log(f"账号 {phone} 的信息发送失败: {error_msg}")
-                return False
+            # 账号库中记录上传的accountId和Cookie指纹
+            from cache_helper import cookie_fingerprint
+            get_account_store(self.log).record_upload(phone, account_id, cookie_fingerprint(cookie))
+            self.log(f"账号 {phone} 的信息已保存到发件箱，等待后台上传")
+            return True
         except Exception as e:
             self.log(f"发送账号信息时出错: {e}")
             traceback.print_exc()
@@ -644,22 +655,17 @@ class KwaiTool:
     def clear_processed(self):
         """清除已处理记录"""
         if messagebox.askyesno("确认", "确定要清除所有已处理的记录吗？\n这将允许重新处理所有账号。"):
-            global processed_accounts
-            processed_accounts = {}
-
-            # 保存空的已处理记录
-            with open(PROCESSED_FILE, "w", encoding="utf-8") as f:
-                json.dump(processed_accounts, f)
+            get_account_store(self.log).clear_processed()
 
             self.log("已清除所有处理记录")
-            self.load_accounts()
+            self.refresh_accounts()
 
     def browser_settings(self):
         """浏览器设置"""
         # 创建配置窗口
         browser_window = tk.Toplevel(self.root)
         browser_window.title("浏览器设置")
-        browser_window.geometry("600x150")
+        browser_window.geometry("600x340")
         browser_window.grab_set()  # 模态窗口
 
         # 创建表单
@@ -698,6 +704,34 @@ class KwaiTool:
         browse_button = ttk.Button(form_frame, text="浏览...", command=browse_browser)
         browse_button.grid(row=0, column=2, padx=5, pady=5)
 
+        # 并发处理的账号数
+        ttk.Label(form_frame, text="并发账号数:").grid(row=1, column=0, sticky=tk.W, pady=5)
+        max_workers_var = tk.IntVar(value=browser_config.get("max_workers", 1))
+        ttk.Spinbox(form_frame, from_=1, to=16, textvariable=max_workers_var, width=5).grid(
+            row=1, column=1, sticky=tk.W, pady=5)
+
+        # 无头模式
+        headless_var = tk.BooleanVar(value=browser_config.get("headless", False))
+        ttk.Checkbutton(form_frame, text="无头模式（不显示浏览器窗口）", variable=headless_var).grid(
+            row=2, column=1, sticky=tk.W, pady=5)
+
+        # 资源过滤，登录所需的脚本和接口请求不受影响
+        ttk.Label(form_frame, text="屏蔽资源:").grid(row=3, column=0, sticky=tk.W, pady=5)
+        filter_frame = ttk.Frame(form_frame)
+        filter_frame.grid(row=3, column=1, sticky=tk.W, pady=5)
+        blocked_types = set(browser_config.get("block_resources", []))
+        resource_vars = {}
+        for resource_type, label in (("image", "图片"), ("font", "字体"), ("media", "音视频")):
+            resource_vars[resource_type] = tk.BooleanVar(value=resource_type in blocked_types)
+            ttk.Checkbutton(filter_frame, text=label, variable=resource_vars[resource_type]).pack(side=tk.LEFT, padx=(0, 10))
+        block_analytics_var = tk.BooleanVar(value=browser_config.get("block_analytics", False))
+        ttk.Checkbutton(filter_frame, text="统计脚本", variable=block_analytics_var).pack(side=tk.LEFT)
+
+        # 登录会话复用
+        reuse_sessions_var = tk.BooleanVar(value=browser_config.get("reuse_sessions", True))
+        ttk.Checkbutton(form_frame, text="复用已保存的登录会话（有效时跳过验证码登录）", variable=reuse_sessions_var).grid(
+            row=4, column=1, sticky=tk.W, pady=5)
+
         # 保存按钮
         def save_browser_config():
             browser_path = browser_path_var.get().strip()
@@ -721,6 +755,15 @@ class KwaiTool:
                 config_data = {}
 
             config_data["chrome_path"] = browser_path
+            try:
+                config_data["max_workers"] = max(1, int(max_workers_var.get()))
+            except (tk.TclError, ValueError):
+                messagebox.showwarning("警告", "并发账号数必须是正整数")
+                return
+            config_data["headless"] = headless_var.get()
+            config_data["block_resources"] = [name for name, var in resource_vars.items() if var.get()]
+            config_data["block_analytics"] = block_analytics_var.get()
+            config_data["reuse_sessions"] = reuse_sessions_var.get()
 
             try:
                 with open("config.json", "w", encoding="utf-8") as f:
@@ -745,7 +788,9 @@ class KwaiTool:
 
 1. 导入账号：
    - 点击"文件"→"导入账号"或工具栏上的"导入账号"按钮
-   - 选择包含账号信息的文本文件（每行一个账号）
+   - 选择包含账号信息的文本文件（每行一个账号），或CSV/JSONL文件
+     （列名：手机号、密码、accountId，accountId为选择登录账户时预选的账户）
+   - 已存在和重复的账号自动跳过，导入过程中可点击"取消"停止
 
 2. 处理账号：
    - 先在设置中配置浏览器路径
@@ -760,6 +805,13 @@ class KwaiTool:
 4. 浏览器设置：
    - 点击"设置"→"浏览器设置"
    - 选择Chrome浏览器的可执行文件路径
+   - 设置并发账号数，多个账号同时登录，验证码弹窗按顺序逐个显示
+   - 可开启无头模式，并屏蔽图片、字体、音视频和统计脚本以加快页面加载
+   - 等待输入验证码期间，会提前打开下一个账号的登录页并填好手机号（config.json中prewarm_next可关闭）
+   - 登录后通过监听user/info接口响应获取Cookie，只上传kuaishou.com域名下的Cookie
+     （config.json中cookie_capture设为poll改为轮询，cookie_allowlist调整名称和域名白名单）
+   - 一个手机号下有多个账户时可多选，每个账户的Cookie分别上传，无需重复登录
+   - 开启会话复用后，登录成功的会话保存在sessions目录，下次处理时校验有效即跳过验证码登录
         """
 
         help_window = tk.Toplevel(self.root)
@@ -791,35 +843,42 @@ class KwaiTool:
                 return
             stop_event.set()
 
+        if _upload_outbox is not None:
+            _upload_outbox.stop()
+        if _engine_loop is not None:
+            _engine_loop.stop()
+        if _account_store is not None:
+            _account_store.close()
         self.root.destroy()
 
     def show_context_menu(self, event):
         """显示右键菜单"""
-        # 先选中点击的项
-        item = self.accounts_tree.identify_row(event.y)
-        if item:
-            self.accounts_tree.selection_set(item)
+        # 点击的账号不在选中范围内时改为选中该账号
+        phone = self.account_list.identify_phone(event.y)
+        if phone:
+            self.account_list.select(phone)
             self.context_menu.post(event.x_root, event.y_root)
 
     def remove_account(self):
         """从账号列表中删除选中的账号"""
-        selected_item = self.accounts_tree.selection()
-        if not selected_item:
+        selected = self.account_list.selection()
+        if not selected:
             messagebox.showinfo("提示", "请先选择要删除的账号")
             return
-        # 获取选中的账号信息
-        values = self.accounts_tree.item(selected_item[0], "values")
-        username = values[0]
+        if len(selected) == 1:
+            message = f"确定要从处理列表中移除账号 {selected[0]} 吗？"
+        else:
+            message = f"确定要从处理列表中移除选中的 {len(selected)} 个账号吗？"
         # 确认是否删除
-        if messagebox.askyesno("确认删除", f"确定要从处理列表中移除账号 {username} 吗？"):
+        if messagebox.askyesno("确认删除", message):
             try:
-                # 从TreeView中删除
-                self.accounts_tree.delete(selected_item[0])
-                # 删除账号文件
-                account_file = os.path.join(ACCOUNTS_DIR, f"{username}.txt")
-                if os.path.exists(account_file):
-                    os.remove(account_file)
-                self.log(f"已从处理列表中移除账号: {username}")
+                # 从账号库中删除并刷新这些行
+                get_account_store(self.log).remove_many(selected)
+                self.refresh_accounts(selected)
+                if len(selected) == 1:
+                    self.log(f"已从处理列表中移除账号: {selected[0]}")
+                else:
+                    self.log(f"已从处理列表中移除 {len(selected)} 个账号")
             except Exception as e:
                 self.log(f"删除账号失败: {e}")
                 messagebox.showerror("错误", f"删除账号失败: {e}")
@@ -854,13 +913,12 @@ class KwaiTool:
                 return
 
             try:
-                # 创建账号文件
-                account_file = os.path.join(ACCOUNTS_DIR, f"{account}.txt")
-                with open(account_file, "w", encoding="utf-8") as f:
-                    f.write(account)
+                if not get_account_store(self.log).add(account):
+                    messagebox.showinfo("提示", f"账号 {account} 已存在")
+                    return
 
                 self.log(f"成功添加账号: {account}")
-                self.load_accounts()  # 刷新账号列表
+                self.refresh_accounts([account])  # 刷新账号列表
                 add_dialog.destroy()
             except Exception as e:
                 self.log(f"添加账号失败: {e}")
@@ -873,21 +931,41 @@ class KwaiTool:
         add_dialog.bind("<Return>", lambda event: on_submit())
 
 
-# 检查是否在macOS上运行，如果是则尝试修复IMK警告
-if platform.system() == "Darwin":
-    try:
-        import mac_fix
+def startup_elapsed_ms():
+    """从进程导入main模块到现在的耗时（毫秒）"""
+    return (time.perf_counter() - STARTUP_STARTED) * 1000
+
+
+def startup_check():
+    """创建并显示主窗口后立即退出，检查启动耗时是否在预算内"""
+    root = tk.Tk()
+    app = KwaiTool(root, background_services=False)
+    app.refresh_accounts()
+    root.update()
+    elapsed_ms = startup_elapsed_ms()
+    root.destroy()
+    print(f"启动耗时: {elapsed_ms:.0f}ms，预算: {STARTUP_BUDGET_MS:.0f}ms")
+    return elapsed_ms <= STARTUP_BUDGET_MS
 
-        mac_fix.fix_imk_warning()
-    except ImportError:
-        print("未找到mac_fix模块，跳过macOS IMK修复")
 
 # 主程序入口
 if __name__ == "__main__":
+    if "--startup-check" in sys.argv:
+        sys.exit(0 if startup_check() else 1)
+
+    # 检查是否在macOS上运行，如果是则尝试修复IMK警告，需在创建Tk之前设置环境变量
+    if platform.system() == "Darwin":
+        try:
+            import mac_fix
+
+            mac_fix.fix_imk_warning()
+        except ImportError:
+            print("未找到mac_fix模块，跳过macOS IMK修复")
+
     try:
         root = tk.Tk()
         app = KwaiTool(root)
-        app.load_accounts()  # 加载账号列表
+        app.refresh_accounts()  # 加载账号列表
         root.mainloop()
     except Exception as e:
         print(f"程序启动失败: {e}")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+请求统计工具 - 按端点记录请求数、字节数、状态码分布和延迟分位数
+"""
+
+import json
+import threading
+import time
+from collections import deque
+
+
+def percentile(sorted_values, fraction):
+    """计算已排序序列的分位数（最近秩法）"""
+    if not sorted_values:
+        return None
+    index = min(int(fraction * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class EndpointMetrics:
+    """单个端点的统计数据"""
+
+    def __init__(self, window=2048):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.statuses = {}
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        # 只保留最近window次请求的延迟用于计算分位数
+        self.latencies = deque(maxlen=window)
+
+    def snapshot(self):
+        """返回统计快照，延迟单位为毫秒"""
+        ordered = sorted(self.latencies)
+
+        def ms(value):
+            return None if value is None else round(value * 1000, 2)
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "statuses": dict(self.statuses),
+            "latency_ms": {
+                "avg": ms(self.total_latency / self.requests) if self.requests else None,
+                "p50": ms(percentile(ordered, 0.50)),
+                "p95": ms(percentile(ordered, 0.95)),
+                "p99": ms(percentile(ordered, 0.99)),
+                "max": ms(self.max_latency) if self.requests else None
+            }
+        }
+
+
+class MetricsRegistry:
+    """线程安全的端点统计汇总"""
+
+    def __init__(self, window=2048):
+        self.window = window
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self.started_at = time.time()
+
+    def record(self, endpoint, status, latency, bytes_sent=0, bytes_received=0, retry=False, error=False):
+        """
+        记录一次请求
+
+        status为HTTP状态码，网络错误时传入错误类型名称。
+        """
+        with self._lock:
+            metrics = self._endpoints.get(endpoint)
+            if metrics is None:
+                metrics = EndpointMetrics(self.window)
+                self._endpoints[endpoint] = metrics
+            metrics.requests += 1
+            if retry:
+                metrics.retries += 1
+            if error:
+                metrics.errors += 1
+            key = str(status)
+            metrics.statuses[key] = metrics.statuses.get(key, 0) + 1
+            metrics.bytes_sent += bytes_sent
+            metrics.bytes_received += bytes_received
+            metrics.total_latency += latency
+            metrics.max_latency = max(metrics.max_latency, latency)
+            metrics.latencies.append(latency)
+
+    def snapshot(self):
+        """返回所有端点的统计快照"""
+        with self._lock:
+            return {name: metrics.snapshot() for name, metrics in self._endpoints.items()}
+
+    def dump(self, path):
+        """将当前统计以每个端点一行的JSONL格式追加到文件"""
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        snapshot = self.snapshot()
+        with open(path, "a", encoding="utf-8") as f:
+            for endpoint, stats in snapshot.items():
+                line = {"time": now, "since": self.started_at, "endpoint": endpoint}
+                line.update(stats)
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        return snapshot
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+页面工具 - 登录流程中基于条件的等待和元素查找
+"""
+
+import asyncio
+import time
+
+# 默认等待上限（毫秒），可通过config.json的wait_timeouts覆盖
+DEFAULT_WAIT_TIMEOUTS = {
+    # 点击"立即登录"后等待登录表单出现
+    "login_form": 5000,
+    # 提交验证码后等待登录Cookie下发
+    "login_cookie": 10000,
+    # 会话Cookie下发后等待其余Cookie写完
+    "cookie_settle": 1500,
+    # 跳转账户页后等待Cookie稳定
+    "account_cookie": 3000,
+    # 登录表单中各元素的查找上限
+    "selector": 5000,
+}
+
+# 登录成功后下发的会话Cookie，出现任意一个即认为登录完成
+DEFAULT_SESSION_COOKIES = ("kuaishou.ad.esp_st", "kuaishou.ad.uc_st", "passToken")
+
+# 登录完成和切换账户后页面都会请求该接口，响应到达时会话Cookie已经写入
+USER_INFO_URL = "uc.e.kuaishou.com/rest/web/user/info"
+
+# 上传的Cookie只保留这些域名下的，names为空时不限制名称
+DEFAULT_COOKIE_ALLOWLIST = {"names": [], "domains": ["kuaishou.com"]}
+
+
+def cookie_signature(cookies):
+    """Cookie列表的签名，用于判断Cookie是否变化"""
+    return tuple(sorted((c["name"], c.get("domain", ""), c["value"]) for c in cookies))
+
+
+def filter_cookies(cookies, names=None, domains=None):
+    """
+    按名称和域名白名单过滤Cookie
+
+    domains按后缀匹配，"kuaishou.com"同时匹配".kuaishou.com"和"uc.e.kuaishou.com"。
+    names或domains为空时不按该项过滤。
+    """
+    names = set(names or ())
+    domains = [d.lstrip(".") for d in domains or ()]
+    result = []
+    for cookie in cookies:
+        if names and cookie["name"] not in names:
+            continue
+        if domains:
+            domain = cookie.get("domain", "").lstrip(".")
+            if not any(domain == d or domain.endswith("." + d) for d in domains):
+                continue
+        result.append(cookie)
+    return result
+
+
+def cookie_header(cookies):
+    """将Cookie列表拼成请求头格式"""
+    return "; ".join(f"{c['name']}={c['value']}" for c in cookies)
+
+
+async def wait_for_cookies(context, names, timeout=10000, interval=200):
+    """
+    等待上下文中出现任一指定名称的Cookie
+
+    返回 (Cookie列表, 是否等到)。超时后返回当时的Cookie，由调用方决定是否继续。
+    """
+    names = set(names)
+    deadline = time.monotonic() + timeout / 1000
+    while True:
+        cookies = await context.cookies()
+        if any(c["name"] in names for c in cookies):
+            return cookies, True
+        if time.monotonic() >= deadline:
+            return cookies, False
+        await asyncio.sleep(interval / 1000)
+
+
+async def wait_for_cookies_settled(context, timeout=3000, interval=250):
+    """
+    等待Cookie在相邻两次检查之间不再变化
+
+    返回 (Cookie列表, 是否已稳定)。
+    """
+    deadline = time.monotonic() + timeout / 1000
+    cookies = await context.cookies()
+    signature = cookie_signature(cookies)
+    while time.monotonic() < deadline:
+        await asyncio.sleep(interval / 1000)
+        cookies = await context.cookies()
+        current = cookie_signature(cookies)
+        if current == signature:
+            return cookies, True
+        signature = current
+    return cookies, False
+
+
+class CookieCapture:
+    """
+    通过网络事件捕获Cookie
+
+    在页面上监听URL包含url_pattern的成功响应，响应到达即认为Cookie已就绪，
+    不必轮询context.cookies()等待其稳定。须在触发请求的操作（点击登录、页面跳转）
+    之前attach。
+    """
+
+    def __init__(self, url_pattern=USER_INFO_URL):
+        self.url_pattern = url_pattern
+        self.response_url = None
+        self._page = None
+        self._event = asyncio.Event()
+
+    def _on_response(self, response):
+        if self.response_url is None and self.url_pattern in response.url and response.ok:
+            self.response_url = response.url
+            self._event.set()
+
+    def attach(self, page):
+        """开始监听页面响应"""
+        self.detach()
+        self.response_url = None
+        self._event.clear()
+        self._page = page
+        page.on("response", self._on_response)
+        return self
+
+    def detach(self):
+        """停止监听"""
+        if self._page is not None:
+            try:
+                self._page.remove_listener("response", self._on_response)
+            except Exception:
+                pass
+            self._page = None
+
+    @property
+    def captured(self):
+        return self.response_url is not None
+
+    async def wait(self, context, timeout=10000):
+        """
+        等待目标响应
+
+        返回 (Cookie列表, 是否捕获到)。
+        """
+        await wait_for_captures([self], timeout)
+        return await context.cookies(), self.captured
+
+
+async def wait_for_captures(captures, timeout=10000):
+    """等待多个CookieCapture都捕获到响应，返回是否全部捕获，结束后停止所有监听"""
+    try:
+        await asyncio.wait_for(asyncio.gather(*(c._event.wait() for c in captures)), timeout / 1000)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        for capture in captures:
+            capture.detach()
+    return all(c.captured for c in captures)
+
+
+class SelectorTimeout(Exception):
+    """在等待上限内没有找到元素"""
+
+
+class SelectorStrategy:
+    """
+    元素查找策略
+
+    页面可能渲染出几种不同的结构，每轮同时检测所有候选选择器，最先出现的候选胜出，
+    不必逐个等待超时。上次胜出的候选会被记住，下次最先检测。同一事件循环中的所有
+    任务共用同一个策略对象。
+
+    候选可以是选择器字符串，也可以是 {"selector": ..., "closest": ...}，表示找到元素后
+    取其最近的匹配closest的祖先元素（例如按钮内的文字span对应的按钮）。
+    """
+
+    def __init__(self, name, candidates, state="visible"):
+        self.name = name
+        self.candidates = [c if isinstance(c, dict) else {"selector": c} for c in candidates]
+        self.state = state
+        self._preferred = 0
+
+    def ordered_candidates(self):
+        """按上次胜出优先的顺序返回候选"""
+        preferred = self._preferred
+        return [self.candidates[preferred]] + [c for i, c in enumerate(self.candidates) if i != preferred]
+
+    async def _match(self, page, candidate):
+        """检测单个候选，匹配时返回元素"""
+        try:
+            element = await page.query_selector(candidate["selector"])
+            if element is None:
+                return None
+            if self.state == "visible" and not await element.is_visible():
+                return None
+            if candidate.get("closest"):
+                handle = await element.evaluate_handle("(el, sel) => el.closest(sel)", candidate["closest"])
+                element = handle.as_element()
+            return element
+        except Exception:
+            # 页面跳转过程中执行上下文可能被销毁，下一轮再试
+            return None
+
+    async def find(self, page, timeout=5000, interval=100):
+        """查找元素，超时返回None"""
+        deadline = time.monotonic() + timeout / 1000
+        while True:
+            candidates = self.ordered_candidates()
+            matches = await asyncio.gather(*(self._match(page, c) for c in candidates))
+            for candidate, element in zip(candidates, matches):
+                if element is not None:
+                    self._preferred = self.candidates.index(candidate)
+                    return element
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(interval / 1000)
+
+    async def require(self, page, timeout=5000, interval=100):
+        """查找元素，超时抛出SelectorTimeout"""
+        element = await self.find(page, timeout, interval)
+        if element is None:
+            raise SelectorTimeout(f"未找到{self.name}（{timeout}ms）")
+        return element
+
+
+# 登录流程中用到的元素
+LOGIN_SELECTORS = {
+    "login_button": SelectorStrategy("'立即登录'按钮", [
+        "button:has-text('立即登录')",
+        {"selector": "button.ant-btn span:has-text('立即登录')", "closest": "button"},
+        "//button[contains(@class, 'ant-btn')][.//span[text()='立即登录']]",
+    ]),
+    "code_login_tab": SelectorStrategy("'验证码登录'选项卡", [
+        "div.tab.svelte-rlva34:has-text('验证码登录')",
+        "div.tab:has-text('验证码登录')",
+    ]),
+    "phone_input": SelectorStrategy("手机号输入框", [
+        "input.component-input-real-value[placeholder='手机号']",
+        "input[placeholder='手机号']",
+    ]),
+    "send_code_button": SelectorStrategy("发送验证码按钮", [
+        "span.svelte-9i4e5y:has-text('发送手机验证码')",
+        "span:has-text('发送手机验证码')",
+    ]),
+    "code_input": SelectorStrategy("验证码输入框", [
+        "input.component-input-real-value[placeholder='请输入验证码']",
+        "input[placeholder='请输入验证码']",
+    ]),
+    "agree_checkbox": SelectorStrategy("同意条款复选框", [
+        "input.component-checkbox-input.svelte-1x8ouvx",
+        "input.component-checkbox-input",
+    ]),
+    "submit_button": SelectorStrategy("登录按钮", [
+        "button.component-button.submit.component-button-primary",
+        "button.submit.component-button-primary",
+    ]),
+}
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+重试工具 - 为API请求提供按端点配置的重试策略和熔断器
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+class RetryPolicy:
+    """指数退避加随机抖动的重试策略"""
+
+    DEFAULT_RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+
+    def __init__(self, max_attempts=3, base_delay=0.5, max_delay=10, jitter=0.5,
+                 retry_statuses=None, respect_retry_after=True):
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retry_statuses = set(retry_statuses or self.DEFAULT_RETRY_STATUSES)
+        self.respect_retry_after = respect_retry_after
+
+    @classmethod
+    def from_config(cls, config):
+        """从配置字典创建策略，未配置的项使用默认值"""
+        return cls(
+            max_attempts=config.get("max_attempts", 3),
+            base_delay=config.get("base_delay", 0.5),
+            max_delay=config.get("max_delay", 10),
+            jitter=config.get("jitter", 0.5),
+            retry_statuses=config.get("retry_statuses"),
+            respect_retry_after=config.get("respect_retry_after", True)
+        )
+
+    def should_retry_status(self, status_code):
+        """该状态码是否需要重试"""
+        return status_code in self.retry_statuses
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        计算第attempt次失败后的等待秒数
+
+        服务端给出Retry-After时以其为准（不超过max_delay），否则使用带抖动的指数退避。
+        """
+        if retry_after is not None and self.respect_retry_after:
+            return min(max(retry_after, 0), self.max_delay)
+        delay = min(self.base_delay * (2 ** (attempt - 1)), self.max_delay)
+        return delay * (1 - self.jitter * random.random())
+
+
+def parse_retry_after(value):
+    """解析Retry-After响应头，支持秒数和HTTP日期两种格式"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(retry_at.timestamp() - time.time(), 0)
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    连续失败达到failure_threshold次后进入熔断状态，recovery_timeout秒内的请求直接失败；
+    之后放行一个探测请求，成功则恢复，失败则重新熔断。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.recovery_timeout = recovery_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0
+        self._probing = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    def allow_request(self):
+        """当前是否允许发送请求"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probing = False
+            # 半开状态只放行一个探测请求
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def remaining(self):
+        """距离允许探测还有多少秒"""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0
+            return max(self.recovery_timeout - (time.monotonic() - self._opened_at), 0)
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+会话存储 - 按手机号保存登录后的浏览器storage_state，下次处理时跳过短信验证码登录
+"""
+
+import json
+import os
+import threading
+import time
+
+
+class SessionStore:
+    """
+    会话存储
+
+    每个手机号一个JSON文件，内容为 {"phone", "saved_at", "account_id", "state"}，
+    state即BrowserContext.storage_state()的返回值。保存时去掉已过期的Cookie，
+    先写临时文件再替换，写入中途退出不会损坏已有会话。
+    """
+
+    def __init__(self, directory="sessions", max_age=7 * 24 * 3600):
+        self.directory = directory
+        # 超过max_age秒的会话不再使用，为0时不限制
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    def path(self, phone):
+        return os.path.join(self.directory, f"{phone}.json")
+
+    def load(self, phone):
+        """读取会话记录，不存在、损坏或已过期时返回None"""
+        path = self.path(phone)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            self.delete(phone)
+            return None
+        if not isinstance(record, dict) or not isinstance(record.get("state"), dict):
+            self.delete(phone)
+            return None
+        if self.max_age and time.time() - record.get("saved_at", 0) > self.max_age:
+            self.delete(phone)
+            return None
+        return record
+
+    def save(self, phone, state, account_id=None):
+        """保存会话"""
+        now = time.time()
+        cookies = [c for c in state.get("cookies", []) if not (0 < c.get("expires", -1) < now)]
+        record = {
+            "phone": phone,
+            "saved_at": now,
+            "account_id": account_id,
+            "state": {"cookies": cookies, "origins": state.get("origins", [])}
+        }
+        data = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+        path = self.path(phone)
+        tmp_path = path + ".tmp"
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            # 会话文件包含登录凭据，只允许当前用户读写
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+
+    def delete(self, phone):
+        """删除会话"""
+        with self._lock:
+            try:
+                os.remove(self.path(phone))
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def live_cookies(state):
+        """返回storage_state中未过期的Cookie"""
+        now = time.time()
+        return [c for c in state.get("cookies", []) if not (0 < c.get("expires", -1) < now)]
@@ -7,15 +7,19 @@ import os
 import sys
 import json
 import time
-import tkinter as tk
-from tkinter import ttk, messagebox
 import traceback
-from playwright.sync_api import sync_playwright
-from curl_helper import CurlHelper
-import requests
 
-# 创建API客户端实例
-api_client = CurlHelper()
+# API客户端在首次使用时创建
+_api_client = None
+
+
+def get_api_client():
+    """获取API客户端实例，首次调用时创建"""
+    global _api_client
+    if _api_client is None:
+        from curl_helper import CurlHelper
+        _api_client = CurlHelper()
+    return _api_client
 
 def test_multi_account(phone):
     """命令行交互版多账户选择流程，流程与 main.py 一致"""
@@ -36,6 +40,9 @@ def test_multi_account(phone):
         return False
     
     try:
+        import requests
+        from playwright.sync_api import sync_playwright
+
         with sync_playwright() as p:
             browser = p.chromium.launch(
                 headless=False,
@@ -161,15 +168,15 @@ def send_account_info(phone, cookie, account_id=None):
             print(f"将同时上传account_id: {account_id}")
 
         # 获取并打印API端点地址
-        endpoint_url = api_client.get_endpoint_url("account")
+        endpoint_url = get_api_client().get_endpoint_url("account")
         print(f"正在发送数据到API地址: {endpoint_url}")
         print(f"上传数据: account={phone}, cookie长度={len(cookie)}, account_id={account_id}")
 
         # 调用API发送数据
         if account_id:
-            result = api_client.upload_cookies(phone, cookie, account_id)
+            result = get_api_client().upload_cookies(phone, cookie, account_id)
         else:
-            result = api_client.upload_cookies(phone, cookie)
+            result = get_api_client().upload_cookies(phone, cookie)
 
         if result and "error" not in result:
             print(f"账号 {phone} 的信息已成功发送到服务器")
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+上传发件箱 - 先将Cookie记录写入本地日志，再由后台线程上传到服务器
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+import traceback
+
+from jsonl_log import read_entries, open_for_append
+
+
+class UploadOutbox:
+    """
+    持久化的上传发件箱
+
+    每条记录先以一行JSON追加到日志文件并fsync，随后由后台线程通过upload_cookies_batch
+    批量上传，记录ID作为幂等键，重发时与原来的timestamp一起发送，服务端可据此去重。
+    上传成功后追加一条确认记录；服务端明确拒绝（4xx，408和429除外）的记录不再重试，
+    追加一条dead记录并调用on_dead(record, error)。启动时重放日志恢复未确认的记录；
+    确认记录积累到一定数量后将剩余记录写入临时文件并原子替换，压缩日志。
+    每次最多提交drain_batch条记录，两次提交之间检查停止事件，停止时不必等待全部上传完。
+    """
+
+    def __init__(self, client, path="upload_outbox.jsonl", compact_threshold=100,
+                 retry_delay=5, max_retry_delay=300, log=print, on_dead=None, drain_batch=50):
+        self.client = client
+        self.drain_batch = max(1, int(drain_batch))
+        self.path = path
+        self.compact_threshold = compact_threshold
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.log = log
+        self.on_dead = on_dead
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._pending = {}
+        self._acked_since_compact = 0
+        self._file = None
+
+        self._replay()
+        self._file = open_for_append(self.path)
+
+    def _replay(self):
+        """重放日志文件，恢复未确认的记录"""
+        acked = 0
+        for entry in read_entries(self.path):
+            if entry.get("op") == "put":
+                self._pending[entry["id"]] = entry["record"]
+            elif entry.get("op") in ("ack", "dead"):
+                if self._pending.pop(entry["id"], None) is not None:
+                    acked += 1
+
+        self._acked_since_compact = acked
+        if self._pending:
+            print(f"发件箱中有 {len(self._pending)} 条未上传的记录，将在后台继续上传")
+
+    def _append(self, entry):
+        """追加一条日志并落盘，调用方需持有锁"""
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def put(self, account, cookies, account_id=None):
+        """写入一条待上传记录，返回记录ID"""
+        record_id = uuid.uuid4().hex
+        record = {
+            "account": account,
+            "cookies": cookies,
+            "account_id": account_id,
+            "timestamp": time.time()
+        }
+        with self._lock:
+            self._append({"op": "put", "id": record_id, "record": record})
+            self._pending[record_id] = record
+        self._wakeup.set()
+        return record_id
+
+    def ack(self, record_id):
+        """确认一条记录已上传"""
+        self._finish({"op": "ack", "id": record_id})
+
+    def dead(self, record_id, error):
+        """记录一条被服务端拒绝、不再重试的记录"""
+        self._finish({"op": "dead", "id": record_id, "error": error})
+
+    def _finish(self, entry):
+        with self._lock:
+            if self._pending.pop(entry["id"], None) is None:
+                return
+            self._append(entry)
+            self._acked_since_compact += 1
+            if self._acked_since_compact >= self.compact_threshold:
+                self._compact()
+
+    def _compact(self):
+        """只保留未确认的记录，原子替换日志文件，调用方需持有锁"""
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for record_id, record in self._pending.items():
+                f.write(json.dumps({"op": "put", "id": record_id, "record": record}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._file.close()
+        os.replace(temp_path, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._acked_since_compact = 0
+
+    def pending(self):
+        """返回未确认记录的快照"""
+        with self._lock:
+            return list(self._pending.items())
+
+    @staticmethod
+    def is_permanent_failure(result):
+        """服务端明确拒绝的请求，重试也不会成功"""
+        status_code = result.get("status_code") or 0
+        return 400 <= status_code < 500 and status_code not in (408, 429)
+
+    def drain_once(self):
+        """上传所有未确认的记录，返回是否全部成功"""
+        pending = self.pending()
+        all_done = True
+        for start in range(0, len(pending), self.drain_batch):
+            if self._stop_event.is_set():
+                return False
+            records = [dict(record, id=record_id) for record_id, record in pending[start:start + self.drain_batch]]
+            results = self.client.upload_cookies_batch(records)
+            for record, result in zip(records, results):
+                if result and "error" not in result:
+                    self.ack(record["id"])
+                    self.log(f"账号 {record['account']} 的信息已成功发送到服务器")
+                    continue
+                error_msg = result.get("error", "未知错误") if result else "请求失败"
+                if result and self.is_permanent_failure(result):
+                    self.dead(record["id"], error_msg)
+                    self.log(f"账号 {record['account']} 的信息被服务器拒绝，不再重试: {error_msg}")
+                    if self.on_dead:
+                        try:
+                            self.on_dead(record, error_msg)
+                        except Exception as e:
+                            self.log(f"处理上传失败的记录出错: {e}")
+                else:
+                    self.log(f"账号 {record['account']} 的信息发送失败，稍后重试: {error_msg}")
+                    all_done = False
+            # 熔断中继续发送只会立即失败，等待下一轮
+            if any(result and result.get("circuit_open") for result in results):
+                return False
+        return all_done
+
+    def _run(self):
+        """后台上传线程"""
+        delay = self.retry_delay
+        while not self._stop_event.is_set():
+            self._wakeup.clear()
+            try:
+                if self.drain_once():
+                    delay = self.retry_delay
+                    self._wakeup.wait()
+                else:
+                    self._wakeup.wait(delay)
+                    delay = min(delay * 2, self.max_retry_delay)
+            except Exception as e:
+                self.log(f"发件箱上传线程异常: {e}")
+                traceback.print_exc()
+                self._wakeup.wait(delay)
+
+    def start(self):
+        """启动后台上传线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="UploadOutbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        """停止后台上传线程，未上传的记录保留在日志中"""
+        self._stop_event.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                return
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None